@@ -16,7 +16,7 @@
 
 import bpy
 from bpy.types import AddonPreferences
-from bpy.props import EnumProperty, IntProperty, BoolProperty
+from bpy.props import EnumProperty, IntProperty, BoolProperty, StringProperty, FloatProperty
 from . megascans import register_megascans, unregister_megascans
 from . icons import register_icons, unregister_icons
 from . operators import register_operators, unregister_operators
@@ -69,6 +69,13 @@ class OctaneHelperPrefs(AddonPreferences):
         default=6
     )
 
+    disp_triangle_budget: FloatProperty(
+        name="Displacement Budget (M triangles)",
+        description="Triangles the whole scene may have after vertex displacement, used by the displacement planner",
+        min=0.1,
+        default=50
+    )
+
     is_cavity_enabled: BoolProperty(
         name="Enable Cavity map",
         default=False
@@ -109,6 +116,273 @@ class OctaneHelperPrefs(AddonPreferences):
         default = 'ShaderNodeOctUVWProjection'
     )
 
+    ms_force_rebuild: BoolProperty(
+        name='Always Rebuild Materials',
+        description='Build a new material for every Megascans import instead of reusing the one made for the same asset',
+        default=False
+    )
+
+    use_incremental_reimport: BoolProperty(
+        name='Update Assets In Place',
+        description='When Bridge sends an asset that is already in the scene, reload the maps and meshes that changed instead of importing another copy',
+        default=True
+    )
+
+    ms_scatter_mode: EnumProperty(
+        name='Scatter and Plants',
+        description='How the variations of scatter and plant assets are added to the scene',
+        items=[
+            ('EMPTY', 'Parent to Empty', 'Import every variation as its own mesh and parent them to an empty'),
+            ('INSTANCE', 'Collection Instances', 'Keep every variation once in a hidden source collection and place instances of it, duplicates share the mesh data')
+        ],
+        default='EMPTY'
+    )
+
+    use_material_templates: BoolProperty(
+        name='Material Templates',
+        description='Copy the node graph built for an earlier asset with the same maps and settings instead of building it node by node',
+        default=True
+    )
+
+    ms_bulk_import: BoolProperty(
+        name='Bulk Import',
+        description='Import every asset waiting in the Megascans queue as one batch and select the result once at the end',
+        default=True
+    )
+
+    use_alembic_streaming: BoolProperty(
+        name='Stream Alembic Geometry',
+        description='Read the geometry of Alembic Megascans meshes from the .abc file while rendering instead of loading it into Blender meshes',
+        default=True
+    )
+
+    lod_policy: EnumProperty(
+        name='LODs',
+        items=[
+            ('ALL', 'All', 'Import every LOD Bridge sends'),
+            ('HIGHEST', 'Highest', 'Import only the most detailed LOD'),
+            ('SPECIFIC', 'Specific', 'Import only the LOD closest to the chosen level'),
+            ('BUDGET', 'Polycount Budget', 'Import the most detailed LOD under the polycount budget')
+        ],
+        description='Which LODs of a Megascans 3D asset or plant are imported',
+        default='ALL'
+    )
+
+    lod_level: IntProperty(
+        name='LOD Level',
+        min=0,
+        max=8,
+        default=0
+    )
+
+    lod_poly_budget: IntProperty(
+        name='Polycount Budget',
+        min=0,
+        default=100000
+    )
+
+    use_lod_switching: BoolProperty(
+        name='Keep Other LODs on Disk',
+        description='Remember the LODs that were not imported so they can be switched by camera distance',
+        default=False
+    )
+
+    lod_switch_distance: FloatProperty(
+        name='Distance per LOD',
+        description='Camera distance covered by every LOD when switching',
+        min=0.01,
+        default=10,
+        subtype='DISTANCE'
+    )
+
+    asset_budget_mode: EnumProperty(
+        name='Asset Budget',
+        description='What to do when the estimated cost of a Megascans asset is over the budget, the estimate only reads file headers',
+        items=[
+            ('OFF', 'Off', 'Import assets without estimating their cost'),
+            ('WARN', 'Warn', 'Print the estimate and warn about assets over the budget'),
+            ('DOWNGRADE', 'Downgrade', 'Switch to texture displacement, use less detailed LODs and lower the texture resolution until the asset fits the budget')
+        ],
+        default='OFF'
+    )
+
+    asset_memory_budget: IntProperty(
+        name='Memory Budget (MB)',
+        description='Memory one asset may take in RAM or VRAM',
+        min=16,
+        default=2048
+    )
+
+    asset_triangle_budget: FloatProperty(
+        name='Triangle Budget (M)',
+        description='Triangles one asset may render after vertex displacement, in millions',
+        min=0.01,
+        default=20
+    )
+
+    use_import_job: BoolProperty(
+        name='Background Import',
+        description='Import Megascans assets a slice at a time with a progress bar, Esc cancels the import',
+        default=True
+    )
+
+    import_slice_ms: IntProperty(
+        name='Slice (ms)',
+        description='Time spent importing before Blender gets to redraw, a single mesh may take longer',
+        min=10,
+        max=1000,
+        default=50
+    )
+
+    use_mesh_cache: BoolProperty(
+        name='Cache Imported Meshes',
+        description='Keep a .blend of every imported Megascans mesh and append it instead of importing the FBX/OBJ again',
+        default=True
+    )
+
+    library_dir: StringProperty(
+        name='Library Folder',
+        description='Folder with the assets downloaded by Quixel Bridge, indexed for the Megascans Library browser',
+        subtype='DIR_PATH',
+        default=''
+    )
+
+    library_resolution: EnumProperty(
+        name='Library Resolution',
+        description='Texture resolution imported from the local library, the closest one is used when it was not downloaded',
+        items=[
+            ('1K', '1K', ''),
+            ('2K', '2K', ''),
+            ('4K', '4K', ''),
+            ('8K', '8K', '')
+        ],
+        default='2K'
+    )
+
+    cache_dir: StringProperty(
+        name='Cache Folder',
+        description='Folder for cached Megascans meshes and texture proxies, leave empty to use the Blender user data folder',
+        subtype='DIR_PATH',
+        default=''
+    )
+
+    mesh_cache_size: IntProperty(
+        name='Mesh Cache Size (MB)',
+        description='The least recently used meshes are removed once the cache grows over this size',
+        min=0,
+        default=4096
+    )
+
+    mesh_workers: IntProperty(
+        name='Mesh Workers',
+        description='Background Blender processes importing Megascans FBX and OBJ files in parallel, 0 imports them in this Blender',
+        min=0,
+        max=64,
+        default=0
+    )
+
+    mesh_worker_timeout: IntProperty(
+        name='Worker Timeout',
+        description='Seconds a mesh worker may take for one file before it is stopped',
+        min=5,
+        default=120
+    )
+
+    mesh_worker_fallback: BoolProperty(
+        name='Import in Blender if a Worker Fails',
+        description='Import the mesh in this Blender when its worker fails or times out, otherwise the mesh is skipped',
+        default=True
+    )
+
+    use_channel_packing: BoolProperty(
+        name='Pack Grayscale Maps',
+        description='Merge up to three grayscale maps of a Megascans material into one cached RGB file read through channel pickers, the remaining ones use float image nodes',
+        default=False
+    )
+
+    use_texture_proxies: BoolProperty(
+        name='Texture Proxies',
+        description='Use downsampled copies of Megascans textures in the viewport, the full resolution files are swapped in for final renders',
+        default=False
+    )
+
+    proxy_size: IntProperty(
+        name='Proxy Size',
+        description='Longest side of the texture proxies in pixels',
+        min=64,
+        max=8192,
+        default=1024
+    )
+
+    livelink_mode: EnumProperty(
+        name='LiveLink Mode',
+        description='How this Blender receives Quixel Bridge exports',
+        items=[
+            ('DIRECT', 'Direct', 'Listen on the LiveLink port, only one Blender at a time can receive assets'),
+            ('BROKER', 'Broker', 'Join a local broker process that owns the LiveLink port and passes assets on to every Blender session or the routed one')
+        ],
+        default='DIRECT'
+    )
+
+    livelink_broker_port: IntProperty(
+        name='Broker Control Port',
+        description='Port Blender sessions use to join the LiveLink broker',
+        min=1024,
+        max=65535,
+        default=28889
+    )
+
+    livelink_session: StringProperty(
+        name='Session Name',
+        description='Name of this Blender in the LiveLink broker, leave empty for the file name and process id',
+        default=''
+    )
+
+    livelink_port: IntProperty(
+        name='LiveLink Port',
+        description='Port the Megascans LiveLink listens on for Quixel Bridge exports, applied when the LiveLink is restarted',
+        min=1024,
+        max=65535,
+        default=28888
+    )
+
+    livelink_buffer_size: IntProperty(
+        name='Receive Buffer',
+        description='Bytes read from a Bridge connection at once',
+        min=1024,
+        max=1024*1024,
+        default=4096*2
+    )
+
+    livelink_record_dir: StringProperty(
+        name='Record Payloads',
+        description='Save every payload received from Quixel Bridge to this folder for the replay harness, leave empty to disable',
+        subtype='DIR_PATH',
+        default=''
+    )
+
+    use_payload_journal: BoolProperty(
+        name='Payload Journal',
+        description='Spool the payloads received from Quixel Bridge to the cache folder until their assets are imported, assets left by a crash can be resumed',
+        default=True
+    )
+
+    prefetch_workers: IntProperty(
+        name='Prefetch Threads',
+        description='Threads reading Megascans textures and meshes in the background while the previous asset imports, 0 disables prefetching',
+        min=0,
+        max=16,
+        default=4
+    )
+
+    telemetry_size: IntProperty(
+        name='Stats History',
+        description='Number of Megascans import stage timings kept in memory',
+        min=100,
+        max=1000000,
+        default=10000
+    )
+
     def draw(self, context):
         layout = self.layout
 
@@ -126,11 +400,64 @@ class OctaneHelperPrefs(AddonPreferences):
         col.prop(self, "disp_type")
         if(self.disp_type == "VERTEX"):
             col.prop(self, "disp_level_vertex")
+            col.prop(self, "disp_triangle_budget")
         col = box.column(align=True)
         col.prop(self, "is_cavity_enabled")
         col.prop(self, "is_curvature_enabled")
         col.prop(self, "is_bump_enabled")
         col.prop(self, "is_fuze_enabled")
+        col = box.column(align=True)
+        col.prop(self, 'ms_force_rebuild')
+        col.prop(self, 'use_incremental_reimport')
+        col.prop(self, 'use_material_templates')
+        col.prop(self, 'ms_bulk_import')
+        col.prop(self, 'use_alembic_streaming')
+        col.prop(self, 'ms_scatter_mode')
+        col.prop(self, 'use_import_job')
+        if(self.use_import_job):
+            col.prop(self, 'import_slice_ms')
+        col = box.column(align=True)
+        col.prop(self, 'lod_policy')
+        if(self.lod_policy == 'SPECIFIC'):
+            col.prop(self, 'lod_level')
+        elif(self.lod_policy == 'BUDGET'):
+            col.prop(self, 'lod_poly_budget')
+        if(self.lod_policy != 'ALL'):
+            col.prop(self, 'use_lod_switching')
+            if(self.use_lod_switching):
+                col.prop(self, 'lod_switch_distance')
+        col = box.column(align=True)
+        col.prop(self, 'asset_budget_mode')
+        if(self.asset_budget_mode != 'OFF'):
+            col.prop(self, 'asset_memory_budget')
+            col.prop(self, 'asset_triangle_budget')
+        col = box.column(align=True)
+        col.prop(self, 'library_dir')
+        col.prop(self, 'library_resolution')
+        col = box.column(align=True)
+        col.prop(self, 'cache_dir')
+        col.prop(self, 'use_mesh_cache')
+        if(self.use_mesh_cache):
+            col.prop(self, 'mesh_cache_size')
+        col.prop(self, 'use_channel_packing')
+        col.prop(self, 'mesh_workers')
+        if(self.mesh_workers):
+            col.prop(self, 'mesh_worker_timeout')
+            col.prop(self, 'mesh_worker_fallback')
+        col.prop(self, 'use_texture_proxies')
+        if(self.use_texture_proxies):
+            col.prop(self, 'proxy_size')
+        col = box.column(align=True)
+        col.prop(self, 'livelink_mode')
+        col.prop(self, 'livelink_port')
+        if(self.livelink_mode == 'BROKER'):
+            col.prop(self, 'livelink_broker_port')
+            col.prop(self, 'livelink_session')
+        col.prop(self, 'livelink_buffer_size')
+        col.prop(self, 'prefetch_workers')
+        col.prop(self, 'telemetry_size')
+        col.prop(self, 'use_payload_journal')
+        col.prop(self, 'livelink_record_dir')
         box.separator()
 
         box = layout.box()
@@ -12,104 +12,196 @@
 # ##### QUIXEL AB - Octane Megascans Module FOR BLENDER #####
 
 import bpy
-import threading
+import queue
+import time
 import os
-import json
+import sys
 from bpy.app.handlers import persistent
 from . threads import *
 from . helpers import *
+from . prefetch import start_prefetch, stop_prefetch, prefetch_element, get_prefetched
+from . images import image_cache_report, created_images, rebuild_image_index
+from . registry import material_signature, find_material, register_material, rebuild_material_index
+from . meshcache import import_mesh_cached, get_cache_dir
+from . lods import select_lods, store_lods, OctaneMSSwitchLODs
+from . proxies import register_proxies, unregister_proxies
+from . telemetry import timed_stage, record, set_telemetry_size
+from . instances import find_sources, make_sources, instance_sources
+from . workers import submit_meshes, wait_worker_steps, load_worker_mesh, cancel_worker_job, stop_workers
+from . packing import plan_packs, packing_bytes
+from . templates import template_signature, find_template, store_template, copy_template
+from . lifecycle import start_livelink, stop_livelink, is_livelink_running, livelink_status, join_broker, broker_request
+from . ui import OctaneMSTelemetry, OctaneMSExportTelemetry
+from . planner import OctaneMSDisplacementPlanner
+from . estimate import budget_element
+from . journal import find_pending, load_pending, discard_pending, mark_done
+from . reimport import store_material_files, refresh_material_steps, tag_mesh_objects, find_asset_objects, rebuild_asset_index, is_mesh_changed, swap_mesh_data
+from . browser import register_browser, unregister_browser
 from .. operators.materials import create_material, assign_material_objs
 
-globals()['Megascans_DataSet'] = None
-
-# This stuff is for the Alembic support
-globals()['MG_AlembicPath'] = []
-globals()['MG_Material'] = []
-globals()['MG_ImportComplete'] = False
+# Assets decoded by the LiveLink thread, handed to the main thread in arrival order
+globals()['Megascans_Queue'] = queue.Queue()
+# Seconds between main thread checks of the queue while assets arrive, doubled up to the maximum
+# while it stays empty. The LiveLink thread can not wake the timer, an asset arriving after a quiet
+# spell waits up to queue_idle_max, the ones following it only queue_poll_interval.
+queue_poll_interval = 0.1
+queue_idle_max = 1.0
+queue_idle_interval = queue_poll_interval
 
 disp_levels = {
+    '1K': 'OCTANE_DISPLACEMENT_LEVEL_1024',
     '2K': 'OCTANE_DISPLACEMENT_LEVEL_2048',
     '4K': 'OCTANE_DISPLACEMENT_LEVEL_4096',
     '8K': 'OCTANE_DISPLACEMENT_LEVEL_8192'
 }
 
-def init_import():
-    if(bpy.context.scene.render.engine != 'octane'):
-        print('[Octane Helper] Please activate the Octane engine in order to use the Octane Megascans Module')
-        return None
-    
-    globals()['MG_AlembicPath'] = []
-    globals()['MG_Material'] = []
-    globals()['MG_ImportComplete'] = False
-    
-    json_array = json.loads(globals()['Megascans_DataSet'])
-
-    result = []
-
-    for json_data in json_array:
-        # Asset
-        name = json_data['name'].replace(" ", "_")
-        aid = json_data['id']
-        atype = json_data['type']
-        path = json_data['path']
-        category = json_data['category']
-        categories = json_data['categories']
-        tags = json_data['tags']
-        meshes = [mesh for mesh in json_data['meshList']]
-        components = [component for component in json_data['components'] if component['type'] in supported_textures]
-        components.sort(key=component_sort)
-
-        # Convert diffuse to albedo
-        has_albedo = (len([component for component in json_data['components'] if component['type']=='albedo']) != 0)
-        for component in components:
-            if(component['type']=='diffuse' and not has_albedo):
-                component['type'] = 'albedo'
-        
-        result.append({
-            'name': name, 
-            'id': aid, 
-            'type': atype, 
-            'path': path,
-            'category': category,
-            'categories': categories,
-            'tags': tags,
-            'meshes': meshes,
-            'components': components
-        })
-    
-    return result
+def init_element(json_data):
+    # Asset
+    name = json_data['name'].replace(" ", "_")
+    aid = json_data['id']
+    atype = json_data['type']
+    path = json_data['path']
+    category = json_data['category']
+    categories = json_data['categories']
+    tags = json_data['tags']
+    meshes = [mesh for mesh in json_data['meshList']]
+    components = [component for component in json_data['components'] if component['type'] in supported_textures]
+    components.sort(key=component_sort)
 
+    # Convert diffuse to albedo
+    has_albedo = (len([component for component in json_data['components'] if component['type']=='albedo']) != 0)
+    for component in components:
+        if(component['type']=='diffuse' and not has_albedo):
+            component['type'] = 'albedo'
+
+    return {
+        'name': name, 
+        'id': aid, 
+        'type': atype, 
+        'path': path,
+        'category': category,
+        'categories': categories,
+        'tags': tags,
+        'meshes': meshes,
+        'components': components,
+        # Payload journal entry, marked done once the asset was handled
+        'journal': json_data.get('ms_journal')
+    }
+
+# Generators below yield after every bounded piece of work so an import can be time sliced
 def import_meshes(element):
+    return run_steps(import_meshes_steps(element))
+
+def import_meshes_steps(element):
     if(bpy.context.scene.render.engine != 'octane'):
         print('[Octane Helper] Please activate the Octane engine in order to use the Octane Megascans Module')
         return None
     
-    meshes = element['meshes']
+    prefs = bpy.context.preferences.addons['Octane_Helper'].preferences
+    # Only the LODs asked for by the LOD policy
+    meshes = select_lods(element, prefs)
 
+    # Meshes not in the cache start importing in background Blender processes right away
+    if(prefs.mesh_workers):
+        submit_meshes(prefs, element, meshes)
+
+    # Scatter and plants variations can be kept once and placed through collection instances
+    use_instances = (prefs.ms_scatter_mode == 'INSTANCE' and is_in_element(['scatter', 'plants'], element))
+    sources = []
     objects = []
     for mesh in meshes:
         mesh_path = mesh['path']
-        mesh_format = mesh['format']
-
-        bpy.ops.object.select_all(action='DESELECT')
 
-        if mesh_format.lower() == "fbx":
-            bpy.ops.import_scene.fbx(filepath=mesh_path)
-            # get selected objects
-            objects += [ o for o in bpy.context.scene.objects if o.select_get() ]
+        if(use_instances):
+            found = find_sources(mesh_path)
+            if(len(found)):
+                sources += found
+                objects += [obj for collection in found for obj in collection.objects]
+                continue
 
-        elif mesh_format.lower() == "obj":
-            bpy.ops.import_scene.obj(filepath=mesh_path, use_split_objects = True, use_split_groups = True, global_clight_size = 1.0)
-            # get selected objects
-            objects += [ o for o in bpy.context.scene.objects if o.select_get() ]
+        objs = yield from import_mesh_steps(prefs, element, mesh)
+        if(objs is None):
+            continue
+        track_created(element, objs)
+        objects += objs
+        if(use_instances):
+            created = make_sources(bpy.context, objs, mesh_path)
+            element['created_sources'] = element.get('created_sources', []) + created
+            sources += created
+        yield
     
     # Scatter, Plants
-    if (is_in_element(['scatter', 'plants'], element) and len(objects)):
-        group_into_empty(objects, element['name'])
+    if(use_instances and len(sources)):
+        element['instances'] = instance_sources(bpy.context, sources)
+        track_created(element, element['instances'])
+        track_created(element, [group_into_empty(element['instances'], element['name'])])
+    elif (is_in_element(['scatter', 'plants'], element) and len(objects)):
+        track_created(element, [group_into_empty(objects, element['name'])])
+
+    return objects
+
+# Import one mesh file through its worker or the mesh cache, returns None when it was skipped
+def import_mesh_steps(prefs, element, mesh):
+    mesh_path = mesh['path']
+    mesh_format = mesh['format'].lower()
+    result = get_prefetched(element, mesh_path)
+    if(result is not None and not result['exists']):
+        print('[Octane Helper] Skipped {}: the file does not exist'.format(mesh_path))
+        return None
+    start = time.perf_counter()
+
+    blend_path = None
+    if(prefs.mesh_workers):
+        try:
+            blend_path = yield from wait_worker_steps(mesh_path)
+        except Exception as e:
+            print('[Octane Helper] Mesh worker failed for {}: {}'.format(mesh_path, str(e)))
+            if(not prefs.mesh_worker_fallback):
+                return None
+
+    # Imported once per file content, appended from the mesh cache afterwards
+    with timed_stage('mesh', element['name'], bytes=result['bytes'] if result else 0) as counts:
+        if(blend_path):
+            objs = load_worker_mesh(prefs, blend_path)
+        else:
+            objs = import_mesh_cached(prefs, mesh_path, mesh_format, result['digest'] if result else None)
+        counts['meshes'] = len(objs)
+        counts['polys'] = sum([len(obj.data.polygons) for obj in objs if obj.type == 'MESH'])
+    store_lods(objs, mesh)
+    tag_mesh_objects(objs, element, mesh_path)
+    element['timings']['mesh'] += time.perf_counter() - start
+    return objs
 
+# Bridge sent an asset that is already in the scene, swap in the meshes that changed and keep the objects
+def update_meshes_steps(element, existing):
+    prefs = bpy.context.preferences.addons['Octane_Helper'].preferences
+    current = {}
+    for obj in existing:
+        current.setdefault(obj['ms_mesh_path'], []).append(obj)
+    objects = list(existing)
+    for mesh in select_lods(element, prefs):
+        mesh_path = mesh['path']
+        old = current.get(mesh_path, [])
+        if(len(old) and not is_mesh_changed(element, mesh_path, old)):
+            cancel_worker_job(mesh_path)
+            continue
+        objs = yield from import_mesh_steps(prefs, element, mesh)
+        if(objs is None):
+            continue
+        if(len(old)):
+            swap_mesh_data(old, objs)
+            tag_mesh_objects(old, element, mesh_path)
+            print('[Octane Helper] Updated {} objects of {} from {}'.format(len(old), element['name'], os.path.basename(mesh_path)))
+        else:
+            track_created(element, objs)
+            objects += objs
+        yield
     return objects
 
 def import_material(element):
+    return run_steps(import_material_steps(element))
+
+def import_material_steps(element):
     if(bpy.context.scene.render.engine != 'octane'):
         print('[Octane Helper] Please activate the Octane engine in order to use the Octane Megascans Module')
         return None
@@ -118,13 +210,45 @@ def import_material(element):
     mat_name = element['name']
 
     prefs = bpy.context.preferences.addons['Octane_Helper'].preferences
+
+    # Reuse the material built for the same asset and components
+    signature = material_signature(element, prefs)
+    if(not prefs.ms_force_rebuild):
+        mat = find_material(element['id'], signature)
+        if(mat):
+            # Maps changed on disk since the material was built are loaded again
+            yield from refresh_material_steps(prefs, mat, element)
+            bpy.types.Material.copied_mat = mat
+            return mat
+
+    # Copy the graph built for the same components and settings, only the images and per asset values change
+    check_components(element)
+    plan_packs(prefs, element)
+    template_key = template_signature(element, prefs)
+    template = find_template(template_key) if prefs.use_material_templates else None
+    if(template):
+        mat = copy_template(template, 'MS_' + mat_name)
+        register_material(mat, element['id'], signature)
+        element['created_material'] = mat
+        yield from fill_template_steps(mat.node_tree, element)
+        store_material_files(mat, element)
+        graph_start = time.monotonic()
+        set_asset_values(mat.node_tree, element)
+        bpy.types.Material.copied_mat = mat
+        record('material', element['name'], graph_start, time.monotonic() - graph_start, nodes=len(mat.node_tree.nodes), links=len(mat.node_tree.links), templates=1)
+        return mat
+
     mat = create_material(bpy.context, 'MS_' + mat_name, 'ShaderNodeOctUniversalMat')
+    register_material(mat, element['id'], signature)
+    element['created_material'] = mat
     ntree = mat.node_tree
     nodes = ntree.nodes
-    textures = [component['type'] for component in components]
 
-    # Add image textures
-    add_components_tex(ntree, element)
+    # Add image textures, components with missing files are dropped
+    yield from add_components_tex_steps(ntree, element)
+    graph_start = time.monotonic()
+    components = element['components']
+    textures = [component['type'] for component in components]
 
     # All to copied
     #if (is_in_element(['surface', 'atlas'], element)):
@@ -159,11 +283,9 @@ def import_material(element):
     
     # Displacement
     if('displacement' in textures):
-        if prefs.disp_type == 'TEXTURE':
-            resolution = get_component(components, 'displacement')['resolution']
+        if get_disp_type(prefs, element) == 'TEXTURE':
             dispNode = nodes.new('ShaderNodeOctDisplacementTex')
             dispNode.name = 'disp'
-            dispNode.displacement_level = disp_levels[resolution]
             dispNode.displacement_surface = 'OCTANE_DISPLACEMENT_SMOOTH_NORMAL'
             dispNode.inputs['Mid level'].default_value = 0.5
             dispNode.inputs['Height'].default_value = 0.1
@@ -220,96 +342,526 @@ def import_material(element):
     # Curvature
     # ---
 
+    set_asset_values(ntree, element)
+    store_material_files(mat, element)
+    record('material', element['name'], graph_start, time.monotonic() - graph_start, nodes=len(nodes), links=len(ntree.links))
+    if(prefs.use_material_templates):
+        store_template(mat, template_key)
     return mat
 
-class OctaneMSLiveLink(bpy.types.Operator):
-    bl_idname = 'octane.ms_livelink'
-    bl_label = 'Octane Megascans Module'
-    socketCount = 0
+# Values that differ between assets sharing a template
+def set_asset_values(ntree, element):
+    nodes = ntree.nodes
+    if('Smooth' in nodes['root'].inputs):
+        nodes['root'].inputs['Smooth'].default_value = bpy.context.scene.is_smooth
+    if('disp' in nodes and hasattr(nodes['disp'], 'displacement_level')):
+        resolution = get_component(element['components'], 'displacement')['resolution']
+        nodes['disp'].displacement_level = disp_levels[resolution]
 
-    def execute(self, context):
+def import_element(element):
+    return run_steps(import_element_steps(element))
+
+def import_element_steps(element):
+    if(bpy.context.scene.render.engine != 'octane'):
+        print('[Octane Helper] Please activate the Octane engine in order to use the Octane Megascans Module')
+        return None
+
+    start = time.monotonic()
+    prefs = bpy.context.preferences.addons['Octane_Helper'].preferences
+    budget_element(prefs, element)
+    # Import meshes and material, an asset already in the scene is updated in place
+    existing = find_asset_objects(bpy.context.scene, element['id']) if prefs.use_incremental_reimport else []
+    if(len(existing)):
+        objs = yield from update_meshes_steps(element, existing)
+    else:
+        objs = yield from import_meshes_steps(element)
+    mat = yield from import_material_steps(element)
+    assign_material_objs(objs, mat)
+    # The sources stay hidden, the instances are what gets placed and selected
+    if('instances' in element):
+        objs = element['instances']
+    elif(len(existing)):
+        objs = [obj for obj in objs if obj.name in bpy.context.view_layer.objects]
+    timings = element['timings']
+    print('[Octane Helper] Imported {} from Quixel Bridge (texture I/O {:.0f} ms in background, {:.0f} ms waited, mesh I/O {:.0f} ms in background, {:.0f} ms waited, images {:.0f} ms, meshes {:.0f} ms)'.format(
+        element['name'], timings['io']*1000, timings['wait']*1000, timings['mesh_io']*1000, timings['mesh_wait']*1000, timings['datablock']*1000, timings['mesh']*1000))
+    print('[Octane Helper] ' + image_cache_report())
+    record('asset', element['name'], start, time.monotonic() - start, objects=len(objs))
+    if(prefs.use_channel_packing and 'created_material' in element):
+        before, after = packing_bytes(element)
+        if(before):
+            print('[Octane Helper] Grayscale maps of {} use {:.1f} MB instead of {:.1f} MB'.format(mat.name, after / (1024 * 1024), before / (1024 * 1024)))
+    if('proxy_saved' in element):
+        print('[Octane Helper] Texture proxies of {} save {:.1f} MB until the final render'.format(mat.name, element['proxy_saved'] / (1024 * 1024)))
+    return objs
+
+# Hand the meshes of all waiting elements to the workers so they import in parallel,
+# the budget runs first since it may pick other LODs
+def submit_elements(elements):
+    prefs = bpy.context.preferences.addons['Octane_Helper'].preferences
+    for element in elements:
+        budget_element(prefs, element)
+        if(prefs.mesh_workers):
+            submit_meshes(prefs, element, select_lods(element, prefs))
+
+# Import elements inside one batch, objects are selected once at the end
+def import_elements(elements):
+    submit_elements(elements)
+    batch = begin_import_batch(bpy.context)
+    try:
+        for element in elements:
+            objs = import_element(element)
+            if(objs):
+                batch['objects'] += objs
+    finally:
+        end_import_batch(bpy.context, batch)
+        del created_images[:]
+    return batch['objects']
+
+# Import every queued asset right away, returns the number of imported assets
+def import_queued():
+    data_queue = globals()['Megascans_Queue']
+    prefs = bpy.context.preferences.addons['Octane_Helper'].preferences
+    batch = None
+    count = 0
+    submit_elements([element for received, element in list(data_queue.queue)])
+    while not data_queue.empty():
+        received, element = data_queue.get_nowait()
+        record('queue', element['name'], received, time.monotonic() - received)
+        if batch is None:
+            batch = begin_import_batch(bpy.context)
         try:
-            globals()['Megascans_DataSet'] = None
-            self.thread_ = threading.Thread(target=self.socketMonitor)
-            self.thread_.start()
-            bpy.app.timers.register(self.newDataMonitor)
-            return {'FINISHED'}
+            objs = import_element(element)
+            if(objs):
+                batch['objects'] += objs
+            count += 1
         except Exception as e:
-            print('[Octane Helper] Octane Megascans Module Error (OctaneMSLiveLink):', str(e))
-            return {'FAILED'}
+            print('[Octane Helper] Octane Megascans Module Error (import_queued):', str(e))
+        mark_done(element.get('journal'))
+        # Without bulk mode every asset is its own batch
+        if(not prefs.ms_bulk_import):
+            end_import_batch(bpy.context, batch)
+            batch = None
+    if batch is not None:
+        end_import_batch(bpy.context, batch)
+    # Only an interrupted job rolls images back, nothing to keep once the assets are in
+    del created_images[:]
+    return count
+
+class OctaneMSImportJob(bpy.types.Operator):
+    bl_idname = 'octane.ms_import_job'
+    bl_label = 'Import Megascans Assets'
+    bl_description = 'Import the queued Megascans assets a slice at a time, press Esc to cancel'
+    running = False
 
-    def newDataMonitor(self):
-        # Try to start the import process if there is a task every 1 second
+    def invoke(self, context, event):
+        if(OctaneMSImportJob.running):
+            return {'CANCELLED'}
+        OctaneMSImportJob.running = True
+        self.prefs = context.preferences.addons['Octane_Helper'].preferences
+        self.batch = None
+        self.steps = None
+        self.element = None
+        self.point = None
+        self.done_steps = 0
+        self.total_steps = 0
+        self.step_time = 0
+        self.imported = 0
+        wm = context.window_manager
+        self.timer = wm.event_timer_add(0.01, window=context.window)
+        wm.modal_handler_add(self)
+        wm.progress_begin(0, 100)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        result = {'CANCELLED'}
         try:
-            if globals()['Megascans_DataSet'] != None:
-                # Start Import
-                elements = init_import()
-                if(elements):
-                    for element in elements:
-                        # Import meshes and material
-                        objs = import_meshes(element)
-                        mat = import_material(element)
-                        assign_material_objs(objs, mat)
-                        # Select objects
-                        if(len(objs)==1):
-                            bpy.context.view_layer.objects.active = objs[0]
-                        elif(len(objs)>1):
-                            for obj in objs:
-                                obj.select_set(True)
-                            bpy.context.view_layer.objects.active = objs[0]
-                # Finish Import
-                print('Imported an asset from Quixel Bridge')
-                globals()['Megascans_DataSet'] = None
+            result = self.run_slice(context, event)
         except Exception as e:
-            print('[Octane Helper] Octane Megascans Module Error (newDataMonitor):', str(e))
-            return {'FAILED'}
-        return 1.0
+            print('[Octane Helper] Octane Megascans Module Error (OctaneMSImportJob):', str(e))
+        finally:
+            # However the job ends, it must never stay marked as running
+            if('PASS_THROUGH' not in result and OctaneMSImportJob.running):
+                self.cancel(context)
+        return result
+
+    def run_slice(self, context, event):
+        if(event.type == 'ESC'):
+            self.cancel_job(context)
+            return {'CANCELLED'}
+        if(event.type != 'TIMER'):
+            return {'PASS_THROUGH'}
+
+        # Run steps until the slice is used up, always at least one
+        deadline = time.perf_counter() + self.prefs.import_slice_ms / 1000
+        while True:
+            if(self.steps is None and not self.next_element(context)):
+                self.finish(context)
+                return {'FINISHED'}
+            start = time.perf_counter()
+            try:
+                next(self.steps)
+            except StopIteration as e:
+                self.finish_element(context, e.value)
+            except Exception as e:
+                print('[Octane Helper] Octane Megascans Module Error (OctaneMSImportJob):', str(e))
+                rollback_element(self.point, self.element)
+                mark_done(self.element.get('journal'))
+                self.steps = None
+                self.element = None
+            self.done_steps += 1
+            self.step_time += time.perf_counter() - start
+            if(time.perf_counter() >= deadline):
+                break
+        self.update_progress(context)
+        return {'PASS_THROUGH'}
+
+    def next_element(self, context):
+        data_queue = globals()['Megascans_Queue']
+        if(data_queue.empty()):
+            return False
+        received, self.element = data_queue.get_nowait()
+        record('queue', self.element['name'], received, time.monotonic() - received)
+        submit_elements([self.element] + [element for received, element in list(data_queue.queue)])
+        if(self.batch is None):
+            self.batch = begin_import_batch(context)
+        self.point = get_rollback_point()
+        self.steps = import_element_steps(self.element)
+        self.total_steps += count_element_steps(self.element)
+        return True
+
+    def finish_element(self, context, objs):
+        if(objs):
+            self.batch['objects'] += objs
+        mark_done(self.element.get('journal'))
+        self.imported += 1
+        self.steps = None
+        self.element = None
+        # Without bulk mode every asset is its own batch
+        if(not self.prefs.ms_bulk_import):
+            end_import_batch(context, self.batch)
+            self.batch = None
+
+    def update_progress(self, context):
+        queued = [element for received, element in list(globals()['Megascans_Queue'].queue)]
+        remaining = max(0, self.total_steps - self.done_steps) + sum([count_element_steps(element) for element in queued])
+        eta = self.step_time / max(self.done_steps, 1) * remaining
+        context.window_manager.progress_update(100 * self.done_steps / max(self.done_steps + remaining, 1))
+        context.workspace.status_text_set('Importing Megascans assets: {} done, {} left, about {:.0f} s remaining (Esc to cancel)'.format(
+            self.imported, len(queued) + (1 if self.steps else 0), eta))
 
-    def socketMonitor(self):
+    def cancel_job(self, context):
+        data_queue = globals()['Megascans_Queue']
+        dropped = 0
+        while not data_queue.empty():
+            received, element = data_queue.get_nowait()
+            mark_done(element.get('journal'))
+            dropped += 1
+        print('[Octane Helper] Cancelled the Megascans import, {} assets were not imported'.format(dropped + (1 if self.element else 0)))
+        self.drop_element()
+        self.finish(context)
+
+    # Blender ends the job itself when a file is loaded or the window closes
+    def cancel(self, context):
+        if(self.element is not None):
+            print('[Octane Helper] The Megascans import was interrupted, {} was not imported'.format(self.element['name']))
         try:
-            # Making a thread object
-            threadedServer = ms_Init(self.importer)
-            # Start the newly created thread.
-            threadedServer.start()
-            # Making a thread object
-            thread_checker_ = thread_checker()
-            # Start the newly created thread.
-            thread_checker_.start()
+            self.drop_element()
         except Exception as e:
-            print('[Octane Helper] Octane Megascans Module Error (socketMonitor):', str(e))
-            return {'FAILED'}
+            print('[Octane Helper] Octane Megascans Module Error (OctaneMSImportJob.cancel):', str(e))
+        self.finish(context)
+
+    # Undo the element being imported
+    def drop_element(self):
+        if(self.steps is not None):
+            self.steps = None
+            rollback_element(self.point, self.element)
+        if(self.element is not None):
+            mark_done(self.element.get('journal'))
+            self.element = None
 
-    def importer(self, recv_data):
+    def finish(self, context):
         try:
-            globals()['Megascans_DataSet'] = recv_data
-        except Exception as e:
-            print('[Octane Helper] Octane Megascans Module Error starting blender module (importer). Error: ', str(e))
-            return {'FAILED'}
+            if(self.batch is not None):
+                batch = self.batch
+                self.batch = None
+                end_import_batch(context, batch)
+            wm = context.window_manager
+            wm.event_timer_remove(self.timer)
+            wm.progress_end()
+            if(context.workspace):
+                context.workspace.status_text_set(None)
+        finally:
+            del created_images[:]
+            OctaneMSImportJob.running = False
+
+# Called from the LiveLink thread for every decoded asset, normalize it and hand it over
+def receive_element(json_data):
+    try:
+        # Decoded by the LiveLink thread, which timed the JSON decode
+        parse = json_data.pop('ms_parse', None)
+        element = init_element(json_data)
+        if(parse):
+            record('parse', element['name'], parse[0], parse[1], bytes=parse[2])
+        # Start reading the files right away, the main thread may still be busy
+        prefetch_element(element)
+        globals()['Megascans_Queue'].put((time.monotonic(), element))
+    except Exception as e:
+        print('[Octane Helper] Octane Megascans Module Error (importer):', str(e))
+
+def report_connection(start, duration, size, count):
+    record('receive', '', start, duration, bytes=size, assets=count)
+
+# Main thread side of the queue, timers can not be registered from the LiveLink thread
+def queue_monitor():
+    global queue_idle_interval
+    # A timer that raises is unregistered for good, the LiveLink would stop importing
+    try:
+        data_queue = globals()['Megascans_Queue']
+        if data_queue.empty():
+            queue_idle_interval = min(queue_idle_interval * 2, queue_idle_max)
+            return queue_idle_interval
+        queue_idle_interval = queue_poll_interval
+        if OctaneMSImportJob.running:
+            return queue_poll_interval
+        prefs = bpy.context.preferences.addons['Octane_Helper'].preferences
+        override = display_view3d()
+        if(prefs.use_import_job and override):
+            bpy.ops.octane.ms_import_job(override, 'INVOKE_DEFAULT')
+            return queue_poll_interval
+        # No window to run the job in (e.g. background mode), import everything right away
+        import_queued()
+    except Exception as e:
+        print('[Octane Helper] Octane Megascans Module Error (queue_monitor):', str(e))
+    return queue_poll_interval
+
+# Start the LiveLink with the current preferences, returns an error message or None
+def start_megascans_livelink(context):
+    prefs = context.preferences.addons['Octane_Helper'].preferences
+    start_prefetch(prefs.prefetch_workers)
+    set_telemetry_size(prefs.telemetry_size)
+    # Behind the broker the session listens on a free port and the broker owns the Bridge port
+    use_broker = (prefs.livelink_mode == 'BROKER')
+    journal_dir = get_cache_dir(prefs, 'journal') if prefs.use_payload_journal else ''
+    error = start_livelink(receive_element, 0 if use_broker else prefs.livelink_port, prefs.livelink_buffer_size, report_connection, bpy.path.abspath(prefs.livelink_record_dir), journal_dir)
+    if(error is None and use_broker):
+        error = join_broker(get_session_name(prefs), getattr(bpy.app, 'binary_path_python', sys.executable), prefs.livelink_port, prefs.livelink_broker_port)
+        if(error):
+            stop_livelink()
+    if(error is None and not bpy.app.timers.is_registered(queue_monitor)):
+        bpy.app.timers.register(queue_monitor, persistent=True)
+    if(error is None and journal_dir):
+        offer_pending_imports(journal_dir)
+    return error
+
+# Assets an earlier session received but never imported, kept until they are resumed or discarded
+pending_imports = []
+
+def offer_pending_imports(journal_dir):
+    pending_imports[:] = find_pending(journal_dir)
+    if(len(pending_imports)):
+        print('[Octane Helper] {} Megascans assets from an earlier session were not imported, use Megascans > Resume Megascans Imports to import them'.format(len(pending_imports)))
+        bpy.app.timers.register(notify_pending_imports, first_interval=1)
+
+def notify_pending_imports():
+    if(len(pending_imports)):
+        try:
+            notify('{} assets were not imported before Blender closed, see Megascans > Resume Megascans Imports'.format(len(pending_imports)), 'Megascans')
+        except Exception:
+            pass
+    return None
+
+def get_session_name(prefs):
+    if(prefs.livelink_session):
+        return prefs.livelink_session
+    return '{} ({})'.format(bpy.path.basename(bpy.data.filepath) or 'untitled', os.getpid())
+
+def stop_megascans_livelink():
+    if(bpy.app.timers.is_registered(queue_monitor)):
+        bpy.app.timers.unregister(queue_monitor)
+    return stop_livelink()
+
+class OctaneMSLiveLink(bpy.types.Operator):
+    bl_idname = 'octane.ms_livelink'
+    bl_label = 'Start Megascans LiveLink'
+    bl_description = 'Listen for assets exported from Quixel Bridge'
+
+    def execute(self, context):
+        error = start_megascans_livelink(context)
+        if(error):
+            self.report({'WARNING'}, 'Failed to start the Megascans LiveLink: ' + error)
+            return {'CANCELLED'}
+        self.report({'INFO'}, 'Megascans LiveLink ' + livelink_status())
+        return {'FINISHED'}
+
+class OctaneMSLiveLinkStop(bpy.types.Operator):
+    bl_idname = 'octane.ms_livelink_stop'
+    bl_label = 'Stop Megascans LiveLink'
+    bl_description = 'Stop listening for Quixel Bridge and free the port'
+
+    def execute(self, context):
+        if(not stop_megascans_livelink()):
+            self.report({'INFO'}, 'Megascans LiveLink is not running')
+            return {'CANCELLED'}
+        self.report({'INFO'}, 'Megascans LiveLink stopped')
+        return {'FINISHED'}
+
+class OctaneMSLiveLinkRestart(bpy.types.Operator):
+    bl_idname = 'octane.ms_livelink_restart'
+    bl_label = 'Restart Megascans LiveLink'
+    bl_description = 'Restart the Megascans LiveLink, e.g. after changing its port'
+
+    def execute(self, context):
+        stop_megascans_livelink()
+        error = start_megascans_livelink(context)
+        if(error):
+            self.report({'WARNING'}, 'Failed to start the Megascans LiveLink: ' + error)
+            return {'CANCELLED'}
+        self.report({'INFO'}, 'Megascans LiveLink ' + livelink_status())
+        return {'FINISHED'}
+
+# Enum items have to stay referenced while Blender shows them
+broker_sessions = []
+
+def get_broker_sessions(self, context):
+    return broker_sessions
+
+class OctaneMSLiveLinkRoute(bpy.types.Operator):
+    bl_idname = 'octane.ms_livelink_route'
+    bl_label = 'Route Megascans LiveLink'
+    bl_description = 'Pick the Blender session that receives the assets sent to the LiveLink broker'
+
+    session: bpy.props.EnumProperty(
+        name='Session',
+        items=get_broker_sessions
+    )
+
+    def execute(self, context):
+        if(broker_request({'route': self.session}) is None):
+            self.report({'WARNING'}, 'The LiveLink broker is not reachable')
+            return {'CANCELLED'}
+        self.report({'INFO'}, 'Megascans LiveLink ' + livelink_status())
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        status = broker_request({'status': True})
+        if(status is None):
+            self.report({'WARNING'}, 'Set the LiveLink mode to Broker and start the LiveLink first')
+            return {'CANCELLED'}
+        broker_sessions[:] = [('*', 'All Sessions', 'Send every asset to all Blender sessions')] + [(name, name, '') for name in status['sessions']]
+        if(status['route'] in status['sessions']):
+            self.session = status['route']
+        return context.window_manager.invoke_props_dialog(self)
+
+class OctaneMSLiveLinkStatus(bpy.types.Operator):
+    bl_idname = 'octane.ms_livelink_status'
+    bl_label = 'Megascans LiveLink Status'
+    bl_description = 'Show whether the Megascans LiveLink is listening'
+
+    def execute(self, context):
+        self.report({'INFO'}, 'Megascans LiveLink {}, {} assets queued'.format(livelink_status(), globals()['Megascans_Queue'].qsize()))
+        return {'FINISHED'}
+
+class OctaneMSResumeImports(bpy.types.Operator):
+    bl_idname = 'octane.ms_resume_imports'
+    bl_label = 'Resume Megascans Imports'
+    bl_description = 'Import the Megascans assets an earlier session received but did not finish, they are read back from the payload journal'
+
+    @classmethod
+    def poll(cls, context):
+        return len(pending_imports) > 0
+
+    def execute(self, context):
+        count = 0
+        for json_data in load_pending(pending_imports):
+            receive_element(json_data)
+            count += 1
+        del pending_imports[:]
+        self.report({'INFO'}, 'Queued {} Megascans assets'.format(count))
+        return {'FINISHED'}
+
+class OctaneMSDiscardImports(bpy.types.Operator):
+    bl_idname = 'octane.ms_discard_imports'
+    bl_label = 'Discard Megascans Imports'
+    bl_description = 'Forget the Megascans assets an earlier session did not finish importing'
+
+    @classmethod
+    def poll(cls, context):
+        return len(pending_imports) > 0
+
+    def execute(self, context):
+        count = len(pending_imports)
+        discard_pending(pending_imports)
+        del pending_imports[:]
+        self.report({'INFO'}, 'Discarded {} Megascans assets'.format(count))
+        return {'FINISHED'}
 
 @persistent
 def load_ms_module(scene):
+    # The server and its timer survive loading files, only start them once
+    if(is_livelink_running()):
+        return
     try:
-        bpy.ops.octane.ms_livelink()
+        error = start_megascans_livelink(bpy.context)
+        if(error):
+            print('[Octane Helper] Failed to start the Octane Megascans Module:', error)
     except Exception as e:
         print('[Octane Helper] Failed to start the Octane Megascans Module: ', str(e))
 
+# The datablock indexes belong to the open file
+@persistent
+def load_ms_indexes(scene):
+    rebuild_image_index()
+    rebuild_material_index()
+    rebuild_asset_index()
+
+livelink_classes = (
+    OctaneMSLiveLink,
+    OctaneMSLiveLinkStop,
+    OctaneMSLiveLinkRestart,
+    OctaneMSLiveLinkRoute,
+    OctaneMSLiveLinkStatus,
+    OctaneMSResumeImports,
+    OctaneMSDiscardImports,
+)
+
+classes = (
+    OctaneMSSwitchLODs,
+    OctaneMSDisplacementPlanner,
+    OctaneMSImportJob,
+    OctaneMSTelemetry,
+    OctaneMSExportTelemetry,
+)
+
 def register_megascans():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    register_proxies()
+    register_browser()
+    for handler in [handler for handler in bpy.app.handlers.load_post if handler.__name__.lower() == 'load_ms_indexes']:
+        bpy.app.handlers.load_post.remove(handler)
+    bpy.app.handlers.load_post.append(load_ms_indexes)
     if(is_official_here()):
         print('[Octane Helper] Failed to start the Octane Megascans Module: the port is used by the official Quixel add-on, please follow the instruction on wiki to remove it')
         return
-    if(is_me_here()):
-        return
-    bpy.utils.register_class(OctaneMSLiveLink)
+    # Drop handlers left by an earlier load of this module, reloading must never stack listeners
+    for handler in [handler for handler in bpy.app.handlers.load_post if handler.__name__.lower() == 'load_ms_module']:
+        bpy.app.handlers.load_post.remove(handler)
+    for cls in livelink_classes:
+        bpy.utils.register_class(cls)
     bpy.app.handlers.load_post.append(load_ms_module)
 
 def unregister_megascans():
-    if(is_official_here()):
-        return
-    if(is_me_here()):
-        return
-    bpy.app.handlers.load_post.remove(load_ms_module)
-    bpy.utils.unregister_class(OctaneMSLiveLink)
-    if len(bpy.app.handlers.load_post) > 0:
-        # Check if trying to register twice.
-        if 'load_ms_module' in bpy.app.handlers.load_post[0].__name__.lower() or load_ms_module in bpy.app.handlers.load_post:
-            bpy.app.handlers.load_post.remove(load_ms_module)
\ No newline at end of file
+    stop_megascans_livelink()
+    stop_prefetch()
+    stop_workers()
+    unregister_proxies()
+    unregister_browser()
+    if(load_ms_indexes in bpy.app.handlers.load_post):
+        bpy.app.handlers.load_post.remove(load_ms_indexes)
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
+    if(load_ms_module in bpy.app.handlers.load_post):
+        bpy.app.handlers.load_post.remove(load_ms_module)
+        for cls in reversed(livelink_classes):
+            bpy.utils.unregister_class(cls)
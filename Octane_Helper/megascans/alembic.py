@@ -0,0 +1,85 @@
+import bpy
+
+# Import an Alembic file. Streamed, the archive is opened as a cache file and every mesh of it
+# gets an empty object with a MeshSequenceCache modifier, the geometry is only read from the
+# .abc file when the depsgraph evaluates the object and is never loaded into a Blender mesh.
+def import_alembic(mesh_path, stream=True):
+    if(stream):
+        objects = stream_alembic(mesh_path)
+        if(objects is not None):
+            return objects
+        print('[Octane Helper] No objects found in {}, importing the geometry instead of streaming it'.format(mesh_path))
+    collection = bpy.context.collection
+    count = len(collection.objects)
+    bpy.ops.wm.alembic_import(filepath=mesh_path, as_background_job=False)
+    return list(collection.objects)[count:]
+
+def get_cache_modifier(obj):
+    for modifier in obj.modifiers:
+        if(modifier.type == 'MESH_SEQUENCE_CACHE'):
+            return modifier
+    return None
+
+def add_cache_modifier(obj, cache_file, object_path=''):
+    modifier = obj.modifiers.new('MeshSequenceCache', 'MESH_SEQUENCE_CACHE')
+    modifier.cache_file = cache_file
+    modifier.object_path = object_path
+    return modifier
+
+# Paths nothing else is nested under, the shapes of a Megascans archive
+def get_shape_paths(cache_file):
+    paths = [item.path for item in cache_file.object_paths]
+    return [path for path in paths if not any([other.startswith(path + '/') for other in paths])]
+
+# Returns the new objects, or None when the archive could not be read
+def stream_alembic(mesh_path):
+    names = set([cache_file.name for cache_file in bpy.data.cache_files])
+    bpy.ops.cachefile.open(filepath=mesh_path)
+    created = [cache_file for cache_file in bpy.data.cache_files if cache_file.name not in names]
+    if(not len(created)):
+        return None
+    cache_file = created[0]
+    collection = bpy.context.collection
+    # The object paths are only listed once the cache file is evaluated, which needs a user in the scene
+    first = bpy.data.objects.new('', bpy.data.meshes.new(''))
+    collection.objects.link(first)
+    add_cache_modifier(first, cache_file)
+    bpy.context.evaluated_depsgraph_get()
+    paths = get_shape_paths(cache_file)
+    if(not len(paths)):
+        mesh = first.data
+        bpy.data.objects.remove(first)
+        bpy.data.meshes.remove(mesh)
+        if(cache_file.users == 0):
+            bpy.data.cache_files.remove(cache_file)
+        return None
+    objects = []
+    for index, path in enumerate(paths):
+        # Named after the transform that holds the shape, like the Alembic importer does
+        parts = path.strip('/').split('/')
+        name = parts[-2] if len(parts) > 1 else parts[-1]
+        if(index == 0):
+            obj = first
+            obj.name = name
+            obj.data.name = name
+            obj.modifiers[0].object_path = path
+        else:
+            obj = bpy.data.objects.new(name, bpy.data.meshes.new(name))
+            collection.objects.link(obj)
+            add_cache_modifier(obj, cache_file, path)
+        obj.data['ms_alembic_path'] = mesh_path
+        if(len(parts) > 1):
+            constraint = obj.constraints.new('TRANSFORM_CACHE')
+            constraint.cache_file = cache_file
+            constraint.object_path = '/' + '/'.join(parts[:-1])
+        objects.append(obj)
+    return objects
+
+# Cache files only used by the given objects, for cleaning up after a cancelled import
+def get_cache_files(objs):
+    cache_files = []
+    for obj in objs:
+        modifier = get_cache_modifier(obj)
+        if(modifier and modifier.cache_file and modifier.cache_file.users <= 1 and modifier.cache_file not in cache_files):
+            cache_files.append(modifier.cache_file)
+    return cache_files
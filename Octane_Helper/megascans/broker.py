@@ -0,0 +1,237 @@
+# Megascans LiveLink broker, started by the addon when the LiveLink mode is Broker.
+#
+#   python broker.py --port 28888 --control-port 28889
+#
+# Owns the Bridge port and forwards every payload to the Blender sessions that
+# registered on the control port, to the routed one or to all of them. Every
+# session listens on its own local port, the broker connects to it once per
+# payload and passes the payload on as it arrives, so the session decodes it
+# exactly like a payload sent by Bridge.
+#
+# Control messages are JSON lines:
+#   {"register": "name", "port": 50123}   add a session, it leaves when the connection closes,
+#                                         a taken name gets a number and the answer has the name used
+#   {"route": "name"} or {"route": "*"}    send payloads to one session or to all of them
+#   {"status": true}                       list the sessions and the route
+#   {"stop": true}                         stop the broker
+# Every message is answered with one JSON line.
+
+import argparse, json, selectors, socket, sys
+
+class ms_Broker():
+
+    #Sessions that lag behind more than max_pending bytes miss the rest of the payload instead of stalling the others.
+    def __init__(self, port=28888, control_port=28889, max_pending=64*1024*1024):
+        self.port = port
+        self.control_port = control_port
+        self.max_pending = max_pending
+        self.sessions = {}
+        self.route = '*'
+        self.selector = selectors.DefaultSelector()
+        self.running = False
+
+    def listen(self, port, kind):
+        socket_ = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        socket_.bind(('localhost', port))
+        socket_.listen(16)
+        socket_.setblocking(False)
+        self.selector.register(socket_, selectors.EVENT_READ, {'kind': kind})
+        return socket_
+
+    def run(self):
+        self.listen(self.port, 'accept_bridge')
+        self.listen(self.control_port, 'accept_control')
+        self.running = True
+        print('[Octane Helper] Megascans LiveLink broker on port {}, control port {}'.format(self.port, self.control_port), flush=True)
+        while self.running:
+            for key, mask in self.selector.select():
+                data = key.data
+                if data['kind'] in ('accept_bridge', 'accept_control'):
+                    client, addr = key.fileobj.accept()
+                    client.setblocking(False)
+                    kind = 'bridge' if data['kind'] == 'accept_bridge' else 'control'
+                    self.selector.register(client, selectors.EVENT_READ, {'kind': kind, 'buffer': bytearray(), 'sessions': [], 'deliveries': None})
+                elif data['kind'] == 'bridge':
+                    self.read_bridge(key.fileobj, data)
+                elif data['kind'] == 'control':
+                    self.read_control(key.fileobj, data)
+                elif data['kind'] == 'deliver':
+                    self.deliver(key.fileobj, data)
+        for key in list(self.selector.get_map().values()):
+            for delivery in key.data.get('deliveries') or []:
+                self.close_delivery(delivery)
+            key.fileobj.close()
+        self.selector.close()
+
+    def receive(self, client):
+        try:
+            return client.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            return None
+        except OSError:
+            return b''
+
+    # A goodbye is meant for a single listener, never pass it on. Only the first bytes
+    # of a payload are held back until it is clear it is not one.
+    def is_payload(self, head):
+        return bool(head.strip()) and not b'Bye Megascans'.startswith(head)
+
+    # Bridge sends one payload per connection and closes it when done
+    def read_bridge(self, client, data):
+        chunk = self.receive(client)
+        if chunk is None:
+            return
+        if chunk:
+            if data['deliveries'] is None:
+                data['buffer'] += chunk
+                if not self.is_payload(bytes(data['buffer'])):
+                    return
+                chunk = bytes(data['buffer'])
+                data['buffer'] = bytearray()
+                data['deliveries'] = self.open_deliveries()
+            self.forward(data['deliveries'], chunk)
+            return
+        self.selector.unregister(client)
+        client.close()
+        if data['deliveries'] is None:
+            payload = bytes(data['buffer'])
+            if payload.strip() and payload != b'Bye Megascans':
+                data['deliveries'] = self.open_deliveries()
+                self.forward(data['deliveries'], payload)
+        for delivery in data['deliveries'] or []:
+            delivery['closed'] = True
+            self.update_delivery(delivery)
+
+    def read_control(self, client, data):
+        chunk = self.receive(client)
+        if chunk is None:
+            return
+        if not chunk:
+            self.selector.unregister(client)
+            client.close()
+            for name in data['sessions']:
+                self.sessions.pop(name, None)
+                print('[Octane Helper] Session {} left'.format(name), flush=True)
+            # Nobody left to deliver to, the next session starts a new broker
+            if data['sessions'] and not self.sessions:
+                self.running = False
+            return
+        data['buffer'] += chunk
+        while b'\n' in data['buffer']:
+            line, _, rest = bytes(data['buffer']).partition(b'\n')
+            data['buffer'] = bytearray(rest)
+            try:
+                reply = self.command(json.loads(line), data)
+            except (ValueError, KeyError, TypeError) as e:
+                reply = {'ok': False, 'error': str(e)}
+            try:
+                client.sendall((json.dumps(reply) + '\n').encode())
+            except OSError:
+                pass
+
+    def command(self, message, data):
+        reply = {'ok': True}
+        if 'register' in message:
+            name = self.unique_name(str(message['register']))
+            self.sessions[name] = {'port': int(message['port']), 'pending': 0}
+            data['sessions'].append(name)
+            reply['session'] = name
+            print('[Octane Helper] Session {} joined on port {}'.format(name, message['port']), flush=True)
+        elif 'route' in message:
+            self.route = str(message['route'])
+        elif 'stop' in message:
+            self.running = False
+        reply.update({'sessions': sorted(self.sessions), 'route': self.route})
+        return reply
+
+    # Two Blender instances of the same file would otherwise replace each other
+    def unique_name(self, name):
+        unique = name
+        number = 2
+        while unique in self.sessions or unique == '*':
+            unique = '{} ({})'.format(name, number)
+            number += 1
+        return unique
+
+    # One connection per target session, opened when a payload starts
+    def open_deliveries(self):
+        names = [self.route] if self.route in self.sessions else list(self.sessions)
+        deliveries = []
+        for name in names:
+            socket_ = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            socket_.setblocking(False)
+            socket_.connect_ex(('localhost', self.sessions[name]['port']))
+            deliveries.append({'kind': 'deliver', 'name': name, 'session': self.sessions[name], 'socket': socket_,
+                'buffer': bytearray(), 'closed': False, 'registered': False})
+        return deliveries
+
+    # Queue a chunk for every session still receiving the payload
+    def forward(self, deliveries, chunk):
+        for delivery in deliveries:
+            if delivery['socket'] is None:
+                continue
+            if delivery['session']['pending'] + len(chunk) > self.max_pending:
+                print('[Octane Helper] Session {} is busy, dropped the rest of a payload'.format(delivery['name']), flush=True)
+                self.close_delivery(delivery)
+                continue
+            delivery['buffer'] += chunk
+            delivery['session']['pending'] += len(chunk)
+            self.update_delivery(delivery)
+
+    # Wait for the session to be writable only while there is something to send
+    def update_delivery(self, delivery):
+        if delivery['socket'] is None:
+            return
+        if delivery['buffer'] and not delivery['registered']:
+            self.selector.register(delivery['socket'], selectors.EVENT_WRITE, delivery)
+            delivery['registered'] = True
+        elif not delivery['buffer'] and delivery['registered']:
+            self.selector.unregister(delivery['socket'])
+            delivery['registered'] = False
+        if not delivery['buffer'] and delivery['closed']:
+            self.close_delivery(delivery)
+
+    def close_delivery(self, delivery):
+        if delivery['socket'] is None:
+            return
+        if delivery['registered']:
+            self.selector.unregister(delivery['socket'])
+        delivery['socket'].close()
+        delivery['socket'] = None
+        delivery['session']['pending'] -= len(delivery['buffer'])
+        delivery['buffer'] = bytearray()
+
+    # Write as much as the session takes right now, the rest when it is writable again
+    def deliver(self, socket_, delivery):
+        # Closed by an earlier event of the same select
+        if delivery['socket'] is None:
+            return
+        try:
+            error = socket_.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            if error:
+                raise OSError(error, 'connection failed')
+            sent = socket_.send(delivery['buffer'])
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            print('[Octane Helper] Failed to deliver to session {}: {}'.format(delivery['name'], str(e)), flush=True)
+            self.close_delivery(delivery)
+            return
+        del delivery['buffer'][:sent]
+        delivery['session']['pending'] -= sent
+        self.update_delivery(delivery)
+
+def main():
+    parser = argparse.ArgumentParser(description='Megascans LiveLink broker')
+    parser.add_argument('--port', type=int, default=28888)
+    parser.add_argument('--control-port', type=int, default=28889)
+    args = parser.parse_args()
+    try:
+        ms_Broker(args.port, args.control_port).run()
+    except OSError as e:
+        print('[Octane Helper] Megascans LiveLink broker stopped:', str(e), flush=True)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
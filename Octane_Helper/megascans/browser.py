@@ -0,0 +1,122 @@
+import bpy
+import os
+from bpy.types import Operator, PropertyGroup, UIList
+from bpy.props import StringProperty, CollectionProperty, IntProperty
+from . library import library_status, start_indexer, search_library, get_asset, make_json_data
+from . meshcache import get_cache_dir
+
+def get_library_db(prefs):
+    return os.path.join(get_cache_dir(prefs, 'library'), 'library.sqlite')
+
+def update_library_search(self, context):
+    prefs = context.preferences.addons['Octane_Helper'].preferences
+    results = context.window_manager.ms_library_results
+    results.clear()
+    if(not os.path.isfile(get_library_db(prefs))):
+        return
+    for aid, name, atype in search_library(get_library_db(prefs), context.window_manager.ms_library_search):
+        item = results.add()
+        item.asset_id = aid
+        item.name = name
+        item.asset_type = atype
+
+class OctaneMSLibraryItem(PropertyGroup):
+    asset_id: StringProperty(name='Asset ID')
+    asset_type: StringProperty(name='Type')
+
+class OCTANE_UL_ms_library(UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname):
+        if self.layout_type in {'DEFAULT', 'COMPACT'}:
+            row = layout.row(align=True)
+            row.label(text=item.name)
+            row.label(text=item.asset_type)
+            row.operator('octane.ms_library_import', text='', icon='IMPORT').asset_id = item.asset_id
+        elif self.layout_type in {'GRID'}:
+            layout.alignment = 'CENTER'
+            layout.label(text=item.name)
+
+class OctaneMSLibraryIndex(Operator):
+    bl_label = 'Index Megascans Library'
+    bl_idname = 'octane.ms_library_index'
+    bl_description = 'Scan the local Megascans library for new and changed assets in the background'
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        prefs = context.preferences.addons['Octane_Helper'].preferences
+        root = bpy.path.abspath(prefs.library_dir)
+        if(not os.path.isdir(root)):
+            self.report({'WARNING'}, 'Set the Megascans library folder in the preferences first')
+            return {'CANCELLED'}
+        if(not start_indexer(get_library_db(prefs), root)):
+            self.report({'INFO'}, 'The Megascans library is already being indexed')
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
+class OctaneMSLibraryBrowser(Operator):
+    bl_label = 'Megascans Library'
+    bl_idname = 'octane.ms_library_browser'
+    bl_description = 'Search the downloaded Megascans assets and import them without Quixel Bridge'
+    bl_options = {'REGISTER'}
+
+    def draw(self, context):
+        layout = self.layout
+        wm = context.window_manager
+        row = layout.row(align=True)
+        row.prop(wm, 'ms_library_search', text='', icon='VIEWZOOM')
+        row.operator('octane.ms_library_index', text='', icon='FILE_REFRESH')
+        if(library_status['running']):
+            layout.label(text='Indexing the library...', icon='SORTTIME')
+        elif(library_status['error']):
+            layout.label(text=library_status['error'], icon='ERROR')
+        layout.template_list('OCTANE_UL_ms_library', '', wm, 'ms_library_results', wm, 'ms_library_index', rows=12)
+        layout.label(text='{} assets found'.format(len(wm.ms_library_results)))
+
+    def execute(self, context):
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        update_library_search(None, context)
+        return context.window_manager.invoke_props_dialog(self, width=500)
+
+class OctaneMSLibraryImport(Operator):
+    bl_label = 'Import Megascans Asset'
+    bl_idname = 'octane.ms_library_import'
+    bl_description = 'Import the asset from the local Megascans library'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    asset_id: StringProperty()
+
+    def execute(self, context):
+        from . import init_element, import_elements
+        from . prefetch import prefetch_element
+        prefs = context.preferences.addons['Octane_Helper'].preferences
+        asset = get_asset(get_library_db(prefs), self.asset_id)
+        if(asset is None):
+            self.report({'WARNING'}, 'The asset is not in the library index')
+            return {'CANCELLED'}
+        element = init_element(make_json_data(asset, prefs.library_resolution))
+        prefetch_element(element)
+        import_elements([element])
+        return {'FINISHED'}
+
+browser_classes = (
+    OctaneMSLibraryItem,
+    OCTANE_UL_ms_library,
+    OctaneMSLibraryIndex,
+    OctaneMSLibraryBrowser,
+    OctaneMSLibraryImport,
+)
+
+def register_browser():
+    for cls in browser_classes:
+        bpy.utils.register_class(cls)
+    bpy.types.WindowManager.ms_library_search = StringProperty(name='Search', default='', update=update_library_search)
+    bpy.types.WindowManager.ms_library_results = CollectionProperty(type=OctaneMSLibraryItem)
+    bpy.types.WindowManager.ms_library_index = IntProperty(name='Asset', default=0)
+
+def unregister_browser():
+    del bpy.types.WindowManager.ms_library_index
+    del bpy.types.WindowManager.ms_library_results
+    del bpy.types.WindowManager.ms_library_search
+    for cls in reversed(browser_classes):
+        bpy.utils.unregister_class(cls)
@@ -0,0 +1,119 @@
+from . headers import read_image_size, read_mesh_triangles
+from . lods import select_lods, get_polycount
+from . helpers import get_disp_type
+from . planner import subdivided, format_triangles
+from . telemetry import stage_rate
+from . prefetch import peek_prefetched
+
+# Rough costs used until the telemetry has measured imports, and for memory that is never measured
+bytes_per_triangle = 120
+vram_per_triangle = 64
+seconds_per_pixel_byte = 1e-8
+seconds_per_poly = 2e-6
+
+resolution_names = {1024: '1K', 2048: '2K', 4096: '4K', 8192: '8K'}
+min_texture_size = 1024
+
+# Pixels the image ends up with after the budget and the texture proxies shrank it
+def get_image_size(prefs, element, size):
+    width, height, channels, depth = size
+    limits = [element['texture_size']] if 'texture_size' in element else []
+    if(prefs.use_texture_proxies):
+        limits.append(prefs.proxy_size)
+    scale = min([limit / max(width, height, 1) for limit in limits] + [1])
+    return max(1, int(width * scale)), max(1, int(height * scale)), channels, depth
+
+# Predict what an element costs from file headers only, nothing is decoded
+def estimate_element(prefs, element):
+    estimate = {'ram': 0, 'vram': 0, 'triangles': 0, 'rendered': 0, 'seconds': 0, 'texture_size': 0}
+    pixel_bytes = 0
+    for component in element['components']:
+        size = read_image_size(component['path'])
+        if(size is None):
+            continue
+        estimate['texture_size'] = max(estimate['texture_size'], size[0], size[1])
+        width, height, channels, depth = get_image_size(prefs, element, size)
+        # Blender keeps four channels in memory, the render engine what the file has
+        estimate['ram'] += width * height * 4 * (4 if depth > 1 else 1)
+        estimate['vram'] += width * height * channels * depth
+        pixel_bytes += width * height * channels * depth
+    for mesh in select_lods(element, prefs):
+        triangles = read_mesh_triangles(mesh['path'])
+        if(triangles is None):
+            # OBJ is only counted by the prefetch, until it is done the polycount or file size stands in
+            result = peek_prefetched(element, mesh['path'])
+            triangles = result['triangles'] if result else None
+        estimate['triangles'] += triangles if triangles is not None else get_polycount(mesh)
+    estimate['rendered'] = estimate['triangles']
+    if(get_disp_type(prefs, element) == 'VERTEX' and 'displacement' in [component['type'] for component in element['components']]):
+        estimate['rendered'] = subdivided(estimate['triangles'], prefs.disp_level_vertex)
+    estimate['ram'] += estimate['triangles'] * bytes_per_triangle
+    estimate['vram'] += estimate['rendered'] * vram_per_triangle
+    estimate['seconds'] = pixel_bytes * (stage_rate('image', 'pixel_bytes') or seconds_per_pixel_byte) + estimate['triangles'] * (stage_rate('mesh', 'polys') or seconds_per_poly)
+    return estimate
+
+def is_over_budget(prefs, estimate):
+    return (max(estimate['ram'], estimate['vram']) > prefs.asset_memory_budget * 1024 * 1024
+        or estimate['rendered'] > prefs.asset_triangle_budget * 1000000)
+
+# Less detailed LODs only help when the geometry is what blows the budget
+def is_mesh_over_budget(prefs, estimate):
+    return (estimate['rendered'] > prefs.asset_triangle_budget * 1000000
+        or estimate['triangles'] * bytes_per_triangle > prefs.asset_memory_budget * 1024 * 1024 / 2)
+
+# Cheapest change first: vertex displacement, then the LODs, then the texture resolution
+def downgrade_element(prefs, element, estimate):
+    changes = []
+    if(get_disp_type(prefs, element) == 'VERTEX' and estimate['rendered'] > estimate['triangles']):
+        element['disp_type'] = 'TEXTURE'
+        changes.append('texture displacement')
+        estimate = estimate_element(prefs, element)
+    while is_over_budget(prefs, estimate) and is_mesh_over_budget(prefs, estimate):
+        selected = select_lods(element, prefs)
+        element['lod_offset'] = element.get('lod_offset', 0) + 1
+        if(select_lods(element, prefs) == selected):
+            element['lod_offset'] -= 1
+            break
+        estimate = estimate_element(prefs, element)
+    if(element.get('lod_offset')):
+        changes.append('LODs lowered by {}'.format(element['lod_offset']))
+    while is_over_budget(prefs, estimate):
+        size = min(element.get('texture_size', estimate['texture_size']), estimate['texture_size']) // 2
+        if(size < min_texture_size):
+            break
+        element['texture_size'] = size
+        estimate = estimate_element(prefs, element)
+    if('texture_size' in element):
+        changes.append('{} textures'.format(resolution_names.get(element['texture_size'], '{} px'.format(element['texture_size']))))
+        # Keep the displacement level in step with the smaller maps
+        sizes = {name: size for size, name in resolution_names.items()}
+        for component in element['components']:
+            if(sizes.get(component['resolution'], 0) > element['texture_size']):
+                component['resolution'] = resolution_names.get(element['texture_size'], component['resolution'])
+    return estimate, changes
+
+def format_bytes(count):
+    return '{:.0f} MB'.format(count / (1024 * 1024))
+
+def format_estimate(estimate):
+    return 'RAM {}, VRAM {}, {} triangles ({} rendered), about {:.1f} s'.format(
+        format_bytes(estimate['ram']), format_bytes(estimate['vram']), format_triangles(estimate['triangles']),
+        format_triangles(estimate['rendered']), estimate['seconds'])
+
+# Estimate an element once before it is imported, warn or downgrade it according to the budget
+def budget_element(prefs, element):
+    if(prefs.asset_budget_mode == 'OFF' or 'estimate' in element):
+        return
+    estimate = estimate_element(prefs, element)
+    element['estimate'] = estimate
+    if(not is_over_budget(prefs, estimate)):
+        print('[Octane Helper] Estimated {}: {}'.format(element['name'], format_estimate(estimate)))
+        return
+    if(prefs.asset_budget_mode == 'WARN'):
+        print('[Octane Helper] {} is over the asset budget: {}'.format(element['name'], format_estimate(estimate)))
+        return
+    element['estimate'], changes = downgrade_element(prefs, element, estimate)
+    print('[Octane Helper] Downgraded {} to fit the asset budget ({}): {}'.format(
+        element['name'], ', '.join(changes) if len(changes) else 'nothing left to lower', format_estimate(element['estimate'])))
+    if(is_over_budget(prefs, element['estimate'])):
+        print('[Octane Helper] {} is still over the asset budget'.format(element['name']))
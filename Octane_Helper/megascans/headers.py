@@ -0,0 +1,186 @@
+import os
+import re
+import struct
+
+# Read image dimensions from the file header without decoding any pixels.
+# Returns (width, height, channels, bytes per channel) or None for unknown files.
+
+def read_png_size(f):
+    header = f.read(26)
+    if(len(header) < 26 or header[12:16] != b'IHDR'):
+        return None
+    width, height, depth, color_type = struct.unpack('>IIBB', header[16:26])
+    channels = {0: 1, 2: 3, 3: 3, 4: 2, 6: 4}.get(color_type, 4)
+    return width, height, channels, 2 if depth == 16 else 1
+
+def read_jpeg_size(f):
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if(len(marker) < 2 or marker[0] != 0xFF):
+            return None
+        # Start of frame markers carry the size, skip every other segment
+        if(marker[1] in (0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF)):
+            data = f.read(8)
+            if(len(data) < 8):
+                return None
+            depth, height, width, channels = struct.unpack('>BHHB', data[2:8])
+            return width, height, channels, 1
+        length = f.read(2)
+        if(len(length) < 2):
+            return None
+        f.seek(struct.unpack('>H', length)[0] - 2, os.SEEK_CUR)
+
+def read_tiff_size(f):
+    order = f.read(2)
+    endian = '<' if order == b'II' else '>'
+    f.seek(4)
+    offset = struct.unpack(endian + 'I', f.read(4))[0]
+    f.seek(offset)
+    count = struct.unpack(endian + 'H', f.read(2))[0]
+    tags = {}
+    for i in range(count):
+        entry = f.read(12)
+        if(len(entry) < 12):
+            break
+        tag, kind = struct.unpack(endian + 'HH', entry[:4])
+        value = struct.unpack(endian + 'H', entry[8:10])[0] if kind == 3 else struct.unpack(endian + 'I', entry[8:12])[0]
+        tags[tag] = value
+    if(256 not in tags or 257 not in tags):
+        return None
+    # 258 is bits per sample, 277 samples per pixel
+    bits = tags.get(258, 8)
+    return tags[256], tags[257], tags.get(277, 1), 2 if bits == 16 else (4 if bits == 32 else 1)
+
+def read_exr_size(f):
+    f.seek(8)
+    channels = 0
+    half = True
+    while True:
+        name = read_cstring(f)
+        if(not name):
+            return None
+        kind = read_cstring(f)
+        size = struct.unpack('<I', f.read(4))[0]
+        data = f.read(size)
+        if(name == b'channels'):
+            # Channel list entries: name, pixel type, pLinear, reserved, x/y sampling
+            pos = 0
+            while pos < len(data) and data[pos] != 0:
+                end = data.index(b'\x00', pos)
+                pixel_type = struct.unpack('<i', data[end+1:end+5])[0]
+                half = half and pixel_type == 1
+                channels += 1
+                pos = end + 17
+        elif(name == b'dataWindow'):
+            xmin, ymin, xmax, ymax = struct.unpack('<iiii', data)
+            return xmax - xmin + 1, ymax - ymin + 1, max(channels, 1), 2 if half else 4
+
+def read_cstring(f):
+    result = b''
+    while True:
+        c = f.read(1)
+        if(not c or c == b'\x00'):
+            return result
+        result += c
+
+image_readers = {
+    '.png': read_png_size,
+    '.jpg': read_jpeg_size,
+    '.jpeg': read_jpeg_size,
+    '.tif': read_tiff_size,
+    '.tiff': read_tiff_size,
+    '.exr': read_exr_size
+}
+
+def read_image_size(path):
+    reader = image_readers.get(os.path.splitext(path)[1].lower())
+    if(reader is None or not os.path.isfile(path)):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            return reader(f)
+    except (OSError, struct.error, ValueError):
+        return None
+
+# Decoded size of an image in memory
+def read_image_bytes(path):
+    size = read_image_size(path)
+    if(size is None):
+        return 0
+    width, height, channels, depth = size
+    return width * height * channels * depth
+
+# Read triangle counts of mesh files without building any mesh.
+# Returns the number of triangles or None when the file can not be read that way.
+
+fbx_magic = b'Kaydara FBX Binary  \x00'
+
+# Nodes of a binary FBX list as (name, properties offset, children offset, end offset), version 7500 and up use 64 bit offsets
+def read_fbx_nodes(f, start, end, wide):
+    header = struct.Struct('<QQQB' if wide else '<IIIB')
+    nodes = []
+    pos = start
+    while pos + header.size <= end:
+        f.seek(pos)
+        data = f.read(header.size)
+        if(len(data) < header.size):
+            break
+        end_offset, count, length, name_length = header.unpack(data)
+        # A null record closes the list
+        if(end_offset == 0):
+            break
+        name = f.read(name_length)
+        properties = pos + header.size + name_length
+        nodes.append((name, properties, properties + length, end_offset))
+        pos = end_offset
+    return nodes
+
+# Length of the array in the first property of a node, the array itself is never read
+def read_fbx_array_length(f, offset):
+    f.seek(offset)
+    kind = f.read(1)
+    if(kind not in (b'd', b'f', b'i', b'l')):
+        return 0
+    return struct.unpack('<I', f.read(4))[0]
+
+def read_fbx_triangles(f):
+    if(f.read(len(fbx_magic)) != fbx_magic):
+        # ASCII FBX has no cheap way to the counts
+        return None
+    f.seek(23)
+    wide = struct.unpack('<I', f.read(4))[0] >= 7500
+    size = f.seek(0, os.SEEK_END)
+    triangles = 0
+    for name, properties, children, end in read_fbx_nodes(f, 27, size, wide):
+        if(name != b'Objects'):
+            continue
+        for name, properties, geometry, geometry_end in read_fbx_nodes(f, children, end, wide):
+            if(name != b'Geometry'):
+                continue
+            for name, properties, nested, nested_end in read_fbx_nodes(f, geometry, geometry_end, wide):
+                if(name == b'PolygonVertexIndex'):
+                    # Megascans meshes are triangulated, three indices per triangle
+                    triangles += read_fbx_array_length(f, properties) // 3
+    return triangles
+
+obj_face_pattern = re.compile(rb'^f[ \t]+([^\n]*)', re.MULTILINE)
+
+# OBJ has no header, the prefetch counts the faces of complete lines while it reads the file anyway.
+# A face of n vertices makes n - 2 triangles.
+def count_obj_triangles(lines):
+    return sum([len(match.split()) - 2 for match in obj_face_pattern.findall(lines)])
+
+mesh_readers = {
+    '.fbx': read_fbx_triangles
+}
+
+def read_mesh_triangles(path):
+    reader = mesh_readers.get(os.path.splitext(path)[1].lower())
+    if(reader is None or not os.path.isfile(path)):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            return reader(f)
+    except (OSError, struct.error, ValueError):
+        return None
@@ -1,6 +1,16 @@
 import bpy
 import socket
+import errno
+import os
+import time
 from .. operators.nodes import get_y_nodes
+from . prefetch import get_prefetched
+from . images import load_image, created_images
+from . proxies import use_proxy, make_proxy
+from . telemetry import timed_stage
+from . headers import read_image_bytes
+from . alembic import get_cache_files
+from . packing import gray_maps, plan_packs, get_packed_types, make_packed, set_picker_channel
 
 supported_textures = [
     'opacity',
@@ -31,10 +41,52 @@ def display_view3d():
 def component_sort(component):
     return supported_textures.index(component['type'])
 
+# The budget may switch a single asset to texture displacement
+def get_disp_type(prefs, element):
+    return element.get('disp_type', prefs.disp_type)
+
 def get_component(components, name):
     return [component for component in components if component['type'] == name][0]
 
+# Drop the components whose files the prefetch found missing or broken
+def check_components(element):
+    components = []
+    for component in element['components']:
+        result = get_prefetched(element, component['path'])
+        if(result is not None and not result['exists']):
+            print('[Octane Helper] Skipped {}: the file does not exist'.format(component['path']))
+        elif(result is not None and not result['valid']):
+            print('[Octane Helper] Skipped {}: the file is not a valid image'.format(component['path']))
+        else:
+            components.append(component)
+    element['components'] = components
+
+# Run a step generator to the end and return its result
+def run_steps(steps):
+    try:
+        while True:
+            next(steps)
+    except StopIteration as e:
+        return e.value
+
+def set_component_image(prefs, element, texNode, path):
+    start = time.perf_counter()
+    # Assets downgraded to fit the budget use a smaller copy of every image
+    if('texture_size' in element):
+        path = make_proxy(prefs, path, element['texture_size'])[0] or path
+    with timed_stage('image', element['name'], images=1, pixel_bytes=read_image_bytes(path)):
+        if(prefs.use_texture_proxies):
+            element['proxy_saved'] = element.get('proxy_saved', 0) + use_proxy(prefs, texNode, path)
+        else:
+            texNode.image = load_image(path)
+    element['timings']['datablock'] += time.perf_counter() - start
+
 def add_components_tex(ntree, element):
+    check_components(element)
+    run_steps(add_components_tex_steps(ntree, element))
+
+# The components were already checked by the import
+def add_components_tex_steps(ntree, element):
     prefs = bpy.context.preferences.addons['Octane_Helper'].preferences
     components = element['components']
     y_exp = 620
@@ -48,34 +100,147 @@ def add_components_tex(ntree, element):
         projection_node.name = 'projection'
     
     texNodes = []
+    # Grayscale maps packed three to a file, the rest of them get float image nodes
+    packs = element['packs'] if 'packs' in element else plan_packs(prefs, element)
+    packed = get_packed_types(element)
 
     for component in components:
-        texNode = ntree.nodes.new('ShaderNodeOctImageTex')
+        if(component['type'] in packed):
+            continue
+        use_float = (prefs.use_channel_packing and component['type'] in gray_maps)
+        texNode = ntree.nodes.new('ShaderNodeOctFloatImageTex' if use_float else 'ShaderNodeOctImageTex')
         texNode.location = (-720, y_exp)
-        texNode.image = bpy.data.images.load(component['path'])
+        set_component_image(prefs, element, texNode, component['path'])
         texNode.show_texture = True
         texNode.name = component['type']
-        if(component['type'] == 'displacement' and prefs.disp_type == "VERTEX"):
+        if(component['type'] == 'displacement' and get_disp_type(prefs, element) == "VERTEX"):
             texNode.border_mode = 'OCT_BORDER_MODE_CLAMP'
         ntree.links.new(ntree.nodes['transform'].outputs[0], texNode.inputs['Transform'])
         if(use_projection):
             ntree.links.new(ntree.nodes['projection'].outputs[0], texNode.inputs['Projection'])
         texNodes.append(texNode)
         y_exp += -320
+        yield
+
+    for pack in packs:
+        texNode = ntree.nodes.new('ShaderNodeOctImageTex')
+        texNode.location = (-900, y_exp)
+        set_component_image(prefs, element, texNode, make_packed(prefs, pack))
+        texNode.show_texture = True
+        texNode.name = pack['name']
+        ntree.links.new(ntree.nodes['transform'].outputs[0], texNode.inputs['Transform'])
+        if(use_projection):
+            ntree.links.new(ntree.nodes['projection'].outputs[0], texNode.inputs['Projection'])
+        # The pickers carry the component names so the material links find them like image nodes
+        for channel, texture in enumerate(pack['types']):
+            picker = ntree.nodes.new('ShaderNodeOctChannelPickerTex')
+            picker.name = texture
+            picker.location = (-720, y_exp - channel * 120)
+            set_picker_channel(picker, channel)
+            ntree.links.new(texNode.outputs[0], picker.inputs['Texture'])
+        texNodes.append(texNode)
+        y_exp += -320 - 120 * len(pack['types'])
+        yield
     
-    transform_node.location = (-1200, get_y_nodes(ntree, texNodes, 'Mid'))
+    transform_node.location = (-1200, get_y_nodes(ntree, texNodes, 'Mid') if len(texNodes) else 0)
     if(use_projection):
         projection_node.location = (-1200, transform_node.location.y - 350)
 
+# Put the images of an element into the texture nodes of a copied template
+def fill_template_steps(ntree, element):
+    prefs = bpy.context.preferences.addons['Octane_Helper'].preferences
+    packed = get_packed_types(element)
+    for component in element['components']:
+        if(component['type'] not in packed):
+            set_component_image(prefs, element, ntree.nodes[component['type']], component['path'])
+            yield
+    for pack in element.get('packs', []):
+        set_component_image(prefs, element, ntree.nodes[pack['name']], make_packed(prefs, pack))
+        yield
+
 def group_into_empty(objs, name):
-    bpy.ops.object.empty_add(type='SPHERE', radius=0.2)
-    empty = bpy.context.view_layer.objects.active
-    empty.name = name
+    # Created directly, the operator would deselect the whole scene
+    empty = bpy.data.objects.new(name, None)
+    empty.empty_display_type = 'SPHERE'
+    empty.empty_display_size = 0.2
+    empty.location = bpy.context.scene.cursor.location
+    bpy.context.collection.objects.link(empty)
     for obj in objs:
         obj.parent = empty
+    return empty
+
+# Import into a temporary collection so new objects are known without scanning the scene
+def begin_import_batch(context):
+    view_layer = context.view_layer
+    collection = bpy.data.collections.new('.MS_Import')
+    context.scene.collection.children.link(collection)
+    batch = {
+        'target': view_layer.active_layer_collection.collection,
+        'collection': collection,
+        'objects': []
+    }
+    view_layer.active_layer_collection = view_layer.layer_collection.children[collection.name]
+    return batch
+
+# Move the new objects where the user was working and select them in one pass
+def end_import_batch(context, batch):
+    view_layer = context.view_layer
+    collection = batch['collection']
+    target = batch['target']
+    for obj in collection.objects:
+        target.objects.link(obj)
+    bpy.data.collections.remove(collection)
+    layer_collection = find_layer_collection(view_layer.layer_collection, target)
+    if(layer_collection):
+        view_layer.active_layer_collection = layer_collection
+    objs = batch['objects']
+    if(len(objs)):
+        for obj in context.selected_objects:
+            obj.select_set(False)
+        for obj in objs:
+            obj.select_set(True)
+        view_layer.objects.active = objs[0]
+
+def count_element_steps(element):
+    return len(element['meshes']) + len(element['components']) + 2
+
+# Where an element started, used to undo it
+def get_rollback_point():
+    return {'images': len(created_images)}
+
+# Remember the objects an element created, an interrupted element removes exactly these
+def track_created(element, objs):
+    element.setdefault('created_objects', []).extend([obj.name for obj in objs])
+
+# Remove everything an interrupted element has created so far
+def rollback_element(point, element):
+    objs = [bpy.data.objects[name] for name in element.get('created_objects', []) if name in bpy.data.objects]
+    sources = [collection for collection in element.get('created_sources', []) if collection.name in bpy.data.collections]
+    for collection in sources:
+        objs += [obj for obj in collection.objects if obj not in objs]
+    meshes = [obj.data for obj in objs if obj.type == 'MESH' and obj.data.users <= 1]
+    images = [bpy.data.images[name] for name in created_images[point['images']:] if name in bpy.data.images]
+    del created_images[point['images']:]
+    ids = objs + meshes + images + get_cache_files(objs) + sources
+    if('created_material' in element and element['created_material'].name in bpy.data.materials):
+        ids.append(element['created_material'])
+    bpy.data.batch_remove(ids)
+    return len(ids)
+
+def find_layer_collection(layer_collection, collection):
+    if(layer_collection.collection == collection):
+        return layer_collection
+    for child in layer_collection.children:
+        result = find_layer_collection(child, collection)
+        if(result):
+            return result
+    return None
 
 def is_port_in_use(port):
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        # Same options as the LiveLink server, our own closed connections do not count
+        if os.name != 'nt':
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         try:
             s.bind(("127.0.0.1", port))
         except socket.error as e:
@@ -89,11 +254,6 @@ def is_official_here():
         return True
     return False
 
-def is_me_here():
-    if('load_ms_module' in [handler.__name__.lower() for handler in bpy.app.handlers.load_post]):
-        return True
-    return False
-
 def is_in_element(items, element):
     for item in items:
         if item in element['categories'] or item in element['tags']:
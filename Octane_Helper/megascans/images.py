@@ -0,0 +1,58 @@
+import bpy
+import os
+
+# Absolute path to image name, verified against the datablock before use
+image_index = {}
+image_index_ready = False
+image_stats = {'hits': 0, 'misses': 0, 'reloads': 0, 'saved_bytes': 0}
+# Names of the images this session loaded, so an interrupted import can remove them again
+created_images = []
+
+def normalize_path(path):
+    return os.path.normcase(os.path.normpath(os.path.abspath(bpy.path.abspath(path))))
+
+def image_bytes(image):
+    channels = image.channels if image.channels else 4
+    return image.size[0] * image.size[1] * channels * (4 if image.is_float else 1)
+
+def find_image(path):
+    if(not image_index_ready):
+        rebuild_image_index()
+    name = image_index.get(path)
+    if(name in bpy.data.images and normalize_path(bpy.data.images[name].filepath) == path):
+        return bpy.data.images[name]
+    return None
+
+# The index is lost with the session, images loaded before still carry their stats.
+# Built once per file so a new image never costs a scan of all images.
+def rebuild_image_index():
+    global image_index_ready
+    image_index.clear()
+    for image in bpy.data.images:
+        if('ms_mtime' in image and image.source == 'FILE'):
+            image_index[normalize_path(image.filepath)] = image.name
+    image_index_ready = True
+
+# Return the image datablock for a file, loading it only when it is new or has changed on disk
+def load_image(path):
+    path = normalize_path(path)
+    stat = os.stat(path)
+    image = find_image(path)
+    if(image is None):
+        image = bpy.data.images.load(path)
+        image_stats['misses'] += 1
+        created_images.append(image.name)
+    elif(image.get('ms_size') != stat.st_size or image.get('ms_mtime') != stat.st_mtime):
+        image.reload()
+        image_stats['reloads'] += 1
+    else:
+        image_stats['hits'] += 1
+        image_stats['saved_bytes'] += image_bytes(image)
+    image['ms_size'] = stat.st_size
+    image['ms_mtime'] = stat.st_mtime
+    image_index[path] = image.name
+    return image
+
+def image_cache_report():
+    return 'Image cache: {} hits, {} misses, {} reloads, {:.1f} MB saved'.format(
+        image_stats['hits'], image_stats['misses'], image_stats['reloads'], image_stats['saved_bytes'] / (1024 * 1024))
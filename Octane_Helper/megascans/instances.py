@@ -0,0 +1,53 @@
+import bpy
+from . helpers import find_layer_collection
+
+# Hidden home of the variation meshes placed through collection instances
+sources_name = 'Megascans Sources'
+
+# Excluded from the view layer so only the instances are drawn and rendered
+def get_sources_collection(context):
+    collection = bpy.data.collections.get(sources_name)
+    if(collection is None):
+        collection = bpy.data.collections.new(sources_name)
+    if(collection.name not in context.scene.collection.children):
+        context.scene.collection.children.link(collection)
+    layer_collection = find_layer_collection(context.view_layer.layer_collection, collection)
+    if(layer_collection):
+        layer_collection.exclude = True
+    return collection
+
+# Source collections made from a mesh file by an earlier import
+def find_sources(mesh_path):
+    return [collection for collection in bpy.data.collections if collection.get('ms_source_path') == mesh_path]
+
+def get_hierarchy(obj):
+    objs = [obj]
+    for child in obj.children:
+        objs += get_hierarchy(child)
+    return objs
+
+# Move every imported variation into its own source collection
+def make_sources(context, objs, mesh_path):
+    parent = get_sources_collection(context)
+    collections = []
+    for root in [obj for obj in objs if obj.parent is None]:
+        collection = bpy.data.collections.new(root.name)
+        collection['ms_source_path'] = mesh_path
+        parent.children.link(collection)
+        for obj in get_hierarchy(root):
+            for users_collection in list(obj.users_collection):
+                users_collection.objects.unlink(obj)
+            collection.objects.link(obj)
+        collections.append(collection)
+    return collections
+
+# One empty per variation, they share the mesh data of the source objects
+def instance_sources(context, collections):
+    empties = []
+    for collection in collections:
+        empty = bpy.data.objects.new(collection.name, None)
+        empty.instance_type = 'COLLECTION'
+        empty.instance_collection = collection
+        context.collection.objects.link(empty)
+        empties.append(empty)
+    return empties
@@ -0,0 +1,126 @@
+import os
+import json
+import mmap
+
+# Payloads spooled by the LiveLink thread, see ms_Spool. Every spool has an index of the byte
+# ranges of its assets and a list of the assets that were imported, by their start offset.
+
+def get_spool_files(spool_path):
+    base = spool_path[:-len('.spool')]
+    return base + '.index', base + '.done'
+
+def get_spool_pid(spool_path):
+    try:
+        return int(os.path.basename(spool_path).split('_')[1])
+    except (IndexError, ValueError):
+        return 0
+
+def is_process_alive(pid):
+    if(pid == os.getpid()):
+        return True
+    if(os.name == 'nt'):
+        import ctypes
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)
+        if(not handle):
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+# Asset ranges of a spool, the imported ones and whether its connection was closed
+def read_spool_state(spool_path):
+    index_path, done_path = get_spool_files(spool_path)
+    spans = []
+    closed = False
+    with open(index_path) as f:
+        for line in f:
+            if(line.strip() == 'closed'):
+                closed = True
+            elif(line.strip()):
+                start, end = line.split()
+                spans.append((int(start), int(end)))
+    done = set()
+    if(os.path.isfile(done_path)):
+        with open(done_path) as f:
+            done = set([int(line) for line in f if line.strip()])
+    # A spool left by a crash is never closed, nothing will be added to it anymore
+    if(get_spool_pid(spool_path) != os.getpid()):
+        closed = True
+    return spans, done, closed
+
+def remove_spool(spool_path):
+    for path in (spool_path,) + get_spool_files(spool_path):
+        if(os.path.isfile(path)):
+            os.remove(path)
+
+# Remove the spool once every asset of it was imported
+def clean_spool(spool_path):
+    try:
+        spans, done, closed = read_spool_state(spool_path)
+        if(closed and all([start in done for start, end in spans])):
+            remove_spool(spool_path)
+    except OSError as e:
+        print('[Octane Helper] Failed to clean the payload journal {}: {}'.format(spool_path, str(e)))
+
+# Called once an asset was imported, failed or was cancelled, only a crash leaves it in the journal
+def mark_done(journal):
+    if(not journal):
+        return
+    spool_path, start = journal
+    try:
+        with open(get_spool_files(spool_path)[1], 'a') as f:
+            f.write('{}\n'.format(start))
+    except OSError as e:
+        print('[Octane Helper] Failed to update the payload journal {}: {}'.format(spool_path, str(e)))
+        return
+    clean_spool(spool_path)
+
+# Spools of sessions that ended before importing all their assets, as (spool, start, end) ranges
+def find_pending(journal_dir):
+    pending = []
+    if(not os.path.isdir(journal_dir)):
+        return pending
+    for fn in sorted(os.listdir(journal_dir)):
+        spool_path = os.path.join(journal_dir, fn)
+        if(not fn.endswith('.spool') or is_process_alive(get_spool_pid(spool_path))):
+            continue
+        if(not os.path.isfile(get_spool_files(spool_path)[0])):
+            remove_spool(spool_path)
+            continue
+        spans, done, closed = read_spool_state(spool_path)
+        left = [(spool_path, start, end) for start, end in spans if start not in done]
+        if(len(left)):
+            pending += left
+        else:
+            remove_spool(spool_path)
+    return pending
+
+# Decode the pending assets straight from the mapped spools, one asset in memory at a time
+def load_pending(pending):
+    spools = {}
+    for spool_path, start, end in pending:
+        spools.setdefault(spool_path, []).append((start, end))
+    for spool_path, spans in spools.items():
+        with open(spool_path, 'rb') as f:
+            if(os.fstat(f.fileno()).st_size == 0):
+                continue
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for start, end in spans:
+                    try:
+                        json_data = json.loads(data[start:end])
+                    except ValueError as e:
+                        print('[Octane Helper] Skipped a broken asset in the payload journal {}: {}'.format(spool_path, str(e)))
+                        mark_done([spool_path, start])
+                        continue
+                    json_data['ms_journal'] = [spool_path, start]
+                    yield json_data
+
+def discard_pending(pending):
+    for spool_path in set([spool_path for spool_path, start, end in pending]):
+        remove_spool(spool_path)
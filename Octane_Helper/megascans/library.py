@@ -0,0 +1,176 @@
+import os, re, json, time, sqlite3, threading
+
+# Offline index of the assets Bridge downloaded, so they can be imported without the LiveLink.
+# Every asset folder holds a metadata .json with its id next to the mesh and texture files.
+
+texture_pattern = re.compile(r'_(\d+K)_([A-Za-z]+?)(?:_LOD(\d+))?\.(\w+)$', re.IGNORECASE)
+mesh_formats = ('fbx', 'obj', 'abc')
+# Float formats first for height and normal data, the compact ones first for everything else
+float_formats = ['exr', 'tif', 'tiff', 'png', 'jpg', 'jpeg']
+color_formats = ['jpg', 'jpeg', 'png', 'tif', 'tiff', 'exr']
+
+schema = '''
+CREATE TABLE IF NOT EXISTS assets (
+    folder TEXT PRIMARY KEY,
+    mtime REAL,
+    id TEXT,
+    name TEXT,
+    type TEXT,
+    search TEXT,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS assets_id ON assets (id);
+'''
+
+library_status = {'running': False, 'assets': 0, 'updated': 0, 'removed': 0, 'seconds': 0, 'error': None}
+
+def read_metadata(path):
+    try:
+        with open(path, 'rb') as f:
+            data = json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+    if(isinstance(data, dict) and 'id' in data):
+        return data
+    return None
+
+# Asset folders below the root with their metadata, the files of an asset are not searched further
+def find_assets(root):
+    for folder, dirnames, filenames in os.walk(root):
+        for fn in filenames:
+            if(fn.lower().endswith('.json')):
+                metadata = os.path.join(folder, fn)
+                if(read_metadata(metadata)):
+                    dirnames[:] = []
+                    yield folder, metadata
+                    break
+
+# Newest change of the folder or its sub folders, adding or removing a file changes it
+def folder_mtime(folder):
+    mtime = os.stat(folder).st_mtime
+    for path, dirnames, filenames in os.walk(folder):
+        for dirname in dirnames:
+            mtime = max(mtime, os.stat(os.path.join(path, dirname)).st_mtime)
+    return mtime
+
+def read_asset(folder, metadata_path):
+    metadata = read_metadata(metadata_path)
+    if(metadata is None):
+        return None
+    categories = [str(category) for category in metadata.get('categories', [])]
+    tags = [str(tag) for tag in metadata.get('tags', [])]
+    meshes = []
+    textures = []
+    for path, dirnames, filenames in os.walk(folder):
+        for fn in sorted(filenames):
+            ext = os.path.splitext(fn)[1][1:].lower()
+            if(ext in mesh_formats):
+                meshes.append({'path': os.path.join(path, fn), 'format': ext})
+                continue
+            match = texture_pattern.search(fn)
+            # 3D assets can have maps per LOD, the LOD0 ones fit every level
+            if(match and match.group(3) in (None, '0')):
+                textures.append({
+                    'type': match.group(2).lower(),
+                    'resolution': match.group(1).upper(),
+                    'format': match.group(4).lower(),
+                    'path': os.path.join(path, fn)
+                })
+    return {
+        'name': metadata.get('name', os.path.basename(folder)),
+        'id': metadata['id'],
+        'type': categories[0] if len(categories) else '',
+        'path': folder,
+        'category': categories[1].capitalize() if len(categories) > 1 else '',
+        'categories': categories,
+        'tags': tags,
+        'meshList': meshes,
+        'textures': textures
+    }
+
+def search_text(asset):
+    return ' '.join([asset['name'], asset['id'], asset['type']] + asset['categories'] + asset['tags']).lower()
+
+def connect(db_path):
+    connection = sqlite3.connect(db_path)
+    connection.executescript(schema)
+    return connection
+
+# Add new and changed asset folders to the index and drop the ones that are gone
+def index_library(db_path, root):
+    start = time.monotonic()
+    connection = connect(db_path)
+    known = dict(connection.execute('SELECT folder, mtime FROM assets'))
+    seen = set()
+    updated = 0
+    for folder, metadata_path in find_assets(root):
+        seen.add(folder)
+        mtime = folder_mtime(folder)
+        if(known.get(folder) == mtime):
+            continue
+        asset = read_asset(folder, metadata_path)
+        if(asset is None):
+            continue
+        connection.execute('INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (folder, mtime, asset['id'], asset['name'], asset['type'], search_text(asset), json.dumps(asset)))
+        updated += 1
+        if(updated % 500 == 0):
+            connection.commit()
+    removed = [(folder,) for folder in known if folder not in seen]
+    connection.executemany('DELETE FROM assets WHERE folder = ?', removed)
+    connection.commit()
+    connection.close()
+    return {'assets': len(seen), 'updated': updated, 'removed': len(removed), 'seconds': time.monotonic() - start}
+
+def run_indexer(db_path, root):
+    try:
+        library_status.update(index_library(db_path, root))
+    except Exception as e:
+        library_status['error'] = str(e)
+        print('[Octane Helper] Failed to index the Megascans library:', str(e))
+    library_status['running'] = False
+
+def start_indexer(db_path, root):
+    if(library_status['running']):
+        return False
+    library_status.update({'running': True, 'error': None})
+    threading.Thread(target=run_indexer, args=(db_path, root), name='ms_library', daemon=True).start()
+    return True
+
+# Every word has to appear in the name, id, type, categories or tags
+def search_library(db_path, text, limit=200):
+    words = text.lower().split()
+    query = 'SELECT id, name, type FROM assets'
+    if(len(words)):
+        query += ' WHERE ' + ' AND '.join(['search LIKE ?'] * len(words))
+    query += ' ORDER BY name LIMIT ?'
+    connection = connect(db_path)
+    try:
+        return connection.execute(query, ['%' + word + '%' for word in words] + [limit]).fetchall()
+    finally:
+        connection.close()
+
+def get_asset(db_path, aid):
+    connection = connect(db_path)
+    try:
+        row = connection.execute('SELECT data FROM assets WHERE id = ?', (aid,)).fetchone()
+    finally:
+        connection.close()
+    return json.loads(row[0]) if row else None
+
+def resolution_value(resolution):
+    return int(resolution[:-1]) if resolution[:-1].isdigit() else 0
+
+# The LiveLink JSON Bridge would have sent for this asset, one map per type at the wanted resolution
+def make_json_data(asset, resolution):
+    wanted = resolution_value(resolution)
+    components = {}
+    for texture in asset['textures']:
+        formats = float_formats if texture['type'] in ('displacement', 'normal') else color_formats
+        rank = (abs(resolution_value(texture['resolution']) - wanted), formats.index(texture['format']) if texture['format'] in formats else len(formats))
+        if(texture['type'] not in components or rank < components[texture['type']][0]):
+            components[texture['type']] = (rank, texture)
+    json_data = dict(asset)
+    del json_data['textures']
+    json_data['components'] = [texture for rank, texture in components.values()]
+    return json_data
@@ -0,0 +1,113 @@
+import os
+import json
+import time
+import atexit
+import socket
+import subprocess
+from . threads import ms_Init
+from . helpers import is_port_in_use
+
+broker_script = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'broker.py')
+
+# The one LiveLink server of this Blender session
+livelink_server = None
+# Control connection to the broker, the session is registered as long as it is open
+broker_connection = None
+
+def is_livelink_running():
+    return livelink_server is not None and livelink_server.is_alive()
+
+# Start the server unless it already runs, returns an error message or None
+def start_livelink(importer, port, buffer_size, reporter=None, record_dir='', journal_dir=''):
+    global livelink_server
+    if(is_livelink_running()):
+        return None
+    if(port and is_port_in_use(port)):
+        return 'port {} is used by another program'.format(port)
+    livelink_server = ms_Init(importer, port, buffer_size, reporter, record_dir, journal_dir)
+    livelink_server.start()
+    # Binding happens right away on the thread, wait for it to report success or failure
+    livelink_server.ready.wait(5)
+    if(livelink_server.error is not None):
+        error = livelink_server.error
+        livelink_server = None
+        return str(error)
+    return None
+
+def stop_livelink(timeout=5):
+    global livelink_server
+    leave_broker()
+    if(livelink_server is None):
+        return False
+    livelink_server.stop()
+    livelink_server.join(timeout)
+    livelink_server = None
+    return True
+
+def livelink_status():
+    if(is_livelink_running() and broker_connection is not None):
+        status = broker_request({'status': True})
+        if(status):
+            return 'joined the broker as session {} of {}, sending to {}'.format(
+                livelink_server.session, len(status['sessions']), 'all sessions' if status['route'] == '*' else status['route'])
+    if(is_livelink_running()):
+        return 'listening on port {}'.format(livelink_server.port)
+    return 'stopped'
+
+def start_broker(python, port, control_port):
+    kwargs = {'creationflags': subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP} if os.name == 'nt' else {'start_new_session': True}
+    subprocess.Popen([python, broker_script, '--port', str(port), '--control-port', str(control_port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **kwargs)
+
+def connect_broker(control_port):
+    try:
+        return socket.create_connection(('localhost', control_port), timeout=2)
+    except OSError:
+        return None
+
+# Register the running server with the broker, starting the broker when this is the first session
+def join_broker(session, python, port, control_port):
+    global broker_connection
+    if(broker_connection is not None):
+        return None
+    connection = connect_broker(control_port)
+    if(connection is None):
+        start_broker(python, port, control_port)
+        # Another session may have started one at the same time, whichever bound the ports wins
+        deadline = time.monotonic() + 5
+        while connection is None and time.monotonic() < deadline:
+            time.sleep(0.1)
+            connection = connect_broker(control_port)
+    if(connection is None):
+        return 'could not reach the broker on port {}'.format(control_port)
+    broker_connection = connection
+    reply = broker_request({'register': session, 'port': livelink_server.port})
+    if(reply is None):
+        leave_broker()
+        return 'the broker did not answer'
+    # The broker numbers a name another session already uses
+    livelink_server.session = reply.get('session', session)
+    return None
+
+def leave_broker():
+    global broker_connection
+    if(broker_connection is not None):
+        broker_connection.close()
+        broker_connection = None
+
+# Send one control message and wait for its answer, None when the broker is gone
+def broker_request(message):
+    try:
+        broker_connection.sendall((json.dumps(message) + '\n').encode())
+        reply = b''
+        while not reply.endswith(b'\n'):
+            chunk = broker_connection.recv(4096)
+            if(not chunk):
+                return None
+            reply += chunk
+        return json.loads(reply)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+# The server thread is a daemon, still close the socket when Blender quits
+atexit.register(stop_livelink, 1)
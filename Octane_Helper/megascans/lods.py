@@ -0,0 +1,150 @@
+import bpy
+import os
+import re
+import json
+from bpy.types import Operator
+from bpy.props import BoolProperty
+from . meshcache import import_mesh_cached
+from . helpers import begin_import_batch, end_import_batch
+from . alembic import get_cache_modifier
+
+lod_pattern = re.compile(r'_?lod(\d+)', re.IGNORECASE)
+
+# Rough FBX/OBJ size per polygon, only used when Bridge does not send a polycount
+bytes_per_poly = 64
+
+# LOD level of a meshList entry, -1 for the source mesh which is more detailed than LOD0
+def get_lod_level(mesh):
+    if('lod' in mesh):
+        match = re.search(r'\d+', str(mesh['lod']))
+        if match:
+            return int(match.group())
+    match = lod_pattern.search(os.path.basename(mesh['path']))
+    if match:
+        return int(match.group(1))
+    return -1
+
+def get_polycount(mesh):
+    for key in ('polycount', 'polyCount', 'tris'):
+        if(key in mesh):
+            return int(mesh[key])
+    if(os.path.isfile(mesh['path'])):
+        return os.path.getsize(mesh['path']) // bytes_per_poly
+    return 0
+
+# Variations of plants and scatters share one LOD chain each
+def get_variation(mesh):
+    name = os.path.splitext(os.path.basename(mesh['path']))[0]
+    return lod_pattern.sub('', name).lower()
+
+def group_lods(meshes):
+    groups = {}
+    for mesh in meshes:
+        groups.setdefault(get_variation(mesh), []).append(mesh)
+    for variation in groups:
+        groups[variation].sort(key=get_lod_level)
+    return list(groups.values())
+
+def pick_lod(lods, prefs):
+    if(prefs.lod_policy == 'HIGHEST'):
+        return lods[0]
+    if(prefs.lod_policy == 'SPECIFIC'):
+        # The closest available level, Bridge does not always export all of them
+        return min(lods, key=lambda mesh: abs(get_lod_level(mesh) - prefs.lod_level))
+    if(prefs.lod_policy == 'BUDGET'):
+        for mesh in lods:
+            if(get_polycount(mesh) <= prefs.lod_poly_budget):
+                return mesh
+        return lods[-1]
+    return None
+
+# Meshes of an element that should be imported according to the LOD policy,
+# the budget can move every variation a number of levels down its chain
+def select_lods(element, prefs):
+    meshes = element['meshes']
+    offset = element.get('lod_offset', 0)
+    if(prefs.lod_policy == 'ALL'):
+        if(not offset):
+            return meshes
+        return [mesh for lods in group_lods(meshes) for mesh in lods[min(offset, len(lods) - 1):]]
+    selected = []
+    for lods in group_lods(meshes):
+        mesh = pick_lod(lods, prefs)
+        mesh = lods[min(lods.index(mesh) + offset, len(lods) - 1)]
+        if(prefs.use_lod_switching):
+            mesh['lods'] = [{'level': get_lod_level(lod), 'path': lod['path'], 'format': lod['format'].lower()} for lod in lods]
+        selected.append(mesh)
+    return selected
+
+# Remember the other LODs on the objects so they can be swapped in later
+def store_lods(objs, mesh):
+    if('lods' not in mesh):
+        return
+    for obj in objs:
+        if(obj.type == 'MESH'):
+            obj['ms_lods'] = json.dumps(mesh['lods'])
+            obj['ms_lod'] = get_lod_level(mesh)
+            obj.data['ms_lod_path'] = mesh['path']
+
+def get_lod_mesh(prefs, lod):
+    for mesh in bpy.data.meshes:
+        if(mesh.get('ms_lod_path') == lod['path']):
+            return mesh
+    if(not os.path.isfile(lod['path'])):
+        return None
+    # Import it once, keep its mesh data and drop the objects
+    batch = begin_import_batch(bpy.context)
+    objs = import_mesh_cached(prefs, lod['path'], lod['format'])
+    meshes = [obj.data for obj in objs if obj.type == 'MESH']
+    end_import_batch(bpy.context, batch)
+    bpy.data.batch_remove(objs)
+    if(not len(meshes)):
+        return None
+    meshes[0]['ms_lod_path'] = lod['path']
+    return meshes[0]
+
+def swap_lod(prefs, obj, lod):
+    # Streamed Alembic geometry comes from the cache modifier, not the mesh data
+    if(get_cache_modifier(obj)):
+        return False
+    mesh = get_lod_mesh(prefs, lod)
+    if(mesh is None or mesh == obj.data):
+        return False
+    # Materials live on the mesh data, carry them over
+    materials = [mat for mat in obj.data.materials]
+    mesh.materials.clear()
+    for mat in materials:
+        mesh.materials.append(mat)
+    obj.data = mesh
+    obj['ms_lod'] = lod['level']
+    return True
+
+class OctaneMSSwitchLODs(Operator):
+    bl_label = 'Switch Megascans LODs'
+    bl_idname = 'octane.ms_switch_lods'
+    bl_description = 'Swap the LOD of imported Megascans objects by their distance to the scene camera'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    selected_only: BoolProperty(
+        name='Selected Only',
+        default=False
+    )
+
+    def execute(self, context):
+        prefs = context.preferences.addons['Octane_Helper'].preferences
+        camera = context.scene.camera
+        if(camera is None):
+            self.report({'WARNING'}, 'The scene has no camera')
+            return {'CANCELLED'}
+        objs = context.selected_objects if self.selected_only else context.scene.objects
+        count = 0
+        for obj in objs:
+            if('ms_lods' not in obj):
+                continue
+            lods = json.loads(obj['ms_lods'])
+            distance = (obj.matrix_world.translation - camera.matrix_world.translation).length
+            step = min(int(distance / prefs.lod_switch_distance), len(lods) - 1)
+            if(lods[step]['level'] != obj.get('ms_lod') and swap_lod(prefs, obj, lods[step])):
+                count += 1
+        self.report({'INFO'}, 'Switched {} objects'.format(count))
+        return {'FINISHED'}
@@ -0,0 +1,34 @@
+# Runs inside a background Blender started by workers.py, not imported by the addon.
+#
+#   blender -b --factory-startup --python mesh_worker.py -- <mesh path> <fbx|obj> <out .blend>
+#
+# Imports one mesh file with the same options as meshcache.import_mesh_file and
+# writes the new objects to a .blend file the main session appends.
+
+import os
+import sys
+import traceback
+
+import bpy
+
+def main():
+    mesh_path, mesh_format, out_path = sys.argv[sys.argv.index('--') + 1:]
+    # Start from an empty scene so only the imported objects are written
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    if mesh_format == 'fbx':
+        bpy.ops.import_scene.fbx(filepath=mesh_path)
+    elif mesh_format == 'obj':
+        bpy.ops.import_scene.obj(filepath=mesh_path, use_split_objects = True, use_split_groups = True, global_clight_size = 1.0)
+    objects = set(bpy.context.scene.objects)
+    if(not len(objects)):
+        raise RuntimeError('no objects in ' + mesh_path)
+    # Several workers may write into the cache at once, never expose a half written file
+    temp_path = '{}.{}.tmp.blend'.format(out_path[:-6], os.getpid())
+    bpy.data.libraries.write(temp_path, objects)
+    os.replace(temp_path, out_path)
+
+try:
+    main()
+except Exception:
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,97 @@
+import bpy
+import os
+import hashlib
+from . alembic import import_alembic
+
+# Importer options baked into the cached result, part of the cache key
+mesh_import_settings = {
+    'fbx': 'fbx',
+    'obj': 'obj:use_split_objects=True,use_split_groups=True,global_clight_size=1.0'
+}
+
+# Every Megascans cache gets its own folder inside the cache folder
+def get_cache_dir(prefs, name='meshes'):
+    root = bpy.path.abspath(prefs.cache_dir) if prefs.cache_dir else os.path.join(bpy.utils.user_resource('DATAFILES'), 'octane_helper')
+    cache_dir = os.path.join(root, name)
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+    return cache_dir
+
+def file_digest(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(1024*1024)
+            if not data:
+                break
+            digest.update(data)
+    return digest.hexdigest()
+
+def get_cache_path(prefs, digest, mesh_format):
+    return get_cache_file(get_cache_dir(prefs), digest, mesh_format, bpy.app.version_string)
+
+# Safe to call from any thread, everything Blender related is passed in
+def get_cache_file(cache_dir, digest, mesh_format, version):
+    key = hashlib.sha1('|'.join([digest, mesh_import_settings[mesh_format], version]).encode()).hexdigest()
+    return os.path.join(cache_dir, key + '.blend')
+
+# Import a mesh file with the importer Megascans assets need, returns the new objects
+def import_mesh_file(mesh_path, mesh_format):
+    if mesh_format == 'abc':
+        prefs = bpy.context.preferences.addons['Octane_Helper'].preferences
+        return import_alembic(mesh_path, prefs.use_alembic_streaming)
+    collection = bpy.context.collection
+    count = len(collection.objects)
+
+    if mesh_format == 'fbx':
+        bpy.ops.import_scene.fbx(filepath=mesh_path)
+    elif mesh_format == 'obj':
+        bpy.ops.import_scene.obj(filepath=mesh_path, use_split_objects = True, use_split_groups = True, global_clight_size = 1.0)
+
+    # The importers link new objects at the end of the active collection, no need to scan the scene
+    return list(collection.objects)[count:]
+
+def load_cached_mesh(cache_path):
+    # Mark it as recently used for the LRU eviction
+    os.utime(cache_path)
+    with bpy.data.libraries.load(cache_path, link=False) as (data_from, data_to):
+        data_to.objects = data_from.objects
+    objects = [obj for obj in data_to.objects if obj is not None]
+    for obj in objects:
+        bpy.context.collection.objects.link(obj)
+    return objects
+
+def save_cached_mesh(cache_path, objects, max_bytes):
+    # Write next to the target first so a half written file is never picked up
+    temp_path = cache_path[:-6] + '.tmp.blend'
+    bpy.data.libraries.write(temp_path, {*objects})
+    os.replace(temp_path, cache_path)
+    evict_cache(os.path.dirname(cache_path), max_bytes)
+
+# Remove the least recently used files until the cache fits
+def evict_cache(cache_dir, max_bytes):
+    entries = []
+    for fn in os.listdir(cache_dir):
+        if fn.endswith('.blend') and not fn.endswith('.tmp.blend'):
+            stat = os.stat(os.path.join(cache_dir, fn))
+            entries.append((stat.st_mtime, stat.st_size, fn))
+    total = sum([entry[1] for entry in entries])
+    for mtime, size, fn in sorted(entries):
+        if total <= max_bytes:
+            break
+        os.remove(os.path.join(cache_dir, fn))
+        total -= size
+
+def import_mesh_cached(prefs, mesh_path, mesh_format, digest=None):
+    if(not prefs.use_mesh_cache or mesh_format not in mesh_import_settings):
+        return import_mesh_file(mesh_path, mesh_format)
+    cache_path = get_cache_path(prefs, digest if digest else file_digest(mesh_path), mesh_format)
+    if(os.path.isfile(cache_path)):
+        return load_cached_mesh(cache_path)
+    objects = import_mesh_file(mesh_path, mesh_format)
+    if(len(objects)):
+        try:
+            save_cached_mesh(cache_path, objects, prefs.mesh_cache_size * 1024 * 1024)
+        except Exception as e:
+            print('[Octane Helper] Failed to cache {}: {}'.format(mesh_path, str(e)))
+    return objects
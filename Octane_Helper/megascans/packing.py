@@ -0,0 +1,99 @@
+import bpy
+import os
+import hashlib
+from . images import normalize_path
+from . headers import read_image_size
+from . meshcache import get_cache_dir
+
+# Grayscale maps that can share one RGB file, displacement keeps its own for the precision
+gray_maps = ['ao', 'roughness', 'metalness', 'specular', 'opacity', 'cavity', 'curvature']
+
+def packing_supported():
+    return hasattr(bpy.types, 'ShaderNodeOctChannelPickerTex')
+
+# Group the grayscale maps of an element by size, three to a file
+def plan_packs(prefs, element):
+    element['packs'] = []
+    if(not prefs.use_channel_packing or not packing_supported()):
+        return element['packs']
+    groups = {}
+    for component in element['components']:
+        if(component['type'] in gray_maps):
+            size = read_image_size(component['path'])
+            if(size is not None):
+                groups.setdefault(size[:2], []).append(component)
+    for size, components in groups.items():
+        for i in range(0, len(components), 3):
+            chunk = components[i:i+3]
+            # A single map gains nothing from packing, it gets a float image node instead
+            if(len(chunk) < 2):
+                continue
+            element['packs'].append({
+                'name': 'packed_{}'.format(len(element['packs'])),
+                'types': [component['type'] for component in chunk],
+                'paths': [component['path'] for component in chunk],
+                'size': list(size)
+            })
+    return element['packs']
+
+def get_packed_types(element):
+    return [t for pack in element.get('packs', []) for t in pack['types']]
+
+def get_packed_path(prefs, pack):
+    keys = []
+    for path in pack['paths']:
+        stat = os.stat(path)
+        keys += [normalize_path(path), str(stat.st_size), str(stat.st_mtime)]
+    key = hashlib.sha1('|'.join(keys).encode()).hexdigest()
+    return os.path.join(get_cache_dir(prefs, 'packed'), key + '.png')
+
+# Write the maps into the red, green and blue channels of one file once, later imports find it on disk
+def make_packed(prefs, pack):
+    import numpy
+    packed_path = get_packed_path(prefs, pack)
+    if(os.path.isfile(packed_path)):
+        return packed_path
+    width, height = pack['size']
+    pixels = numpy.ones(width * height * 4, dtype=numpy.float32)
+    buffer = numpy.empty(width * height * 4, dtype=numpy.float32)
+    for channel, path in enumerate(pack['paths']):
+        image = bpy.data.images.load(path)
+        image.pixels.foreach_get(buffer)
+        pixels[channel::4] = buffer[0::4]
+        bpy.data.images.remove(image)
+    packed = bpy.data.images.new('.ms_packed', width, height)
+    packed.pixels.foreach_set(pixels)
+    temp_path = packed_path[:-4] + '.tmp.png'
+    packed.filepath_raw = temp_path
+    packed.file_format = 'PNG'
+    packed.save()
+    bpy.data.images.remove(packed)
+    os.replace(temp_path, packed_path)
+    return packed_path
+
+# The channel is an enum socket in newer Octane builds and a node property in older ones
+def set_picker_channel(node, channel):
+    target, attr = (node.inputs['Channel'], 'default_value') if 'Channel' in node.inputs else (node, 'channel')
+    items = [item.identifier for item in target.bl_rna.properties[attr].enum_items]
+    setattr(target, attr, items[channel])
+
+# Texture memory of the grayscale maps as separate RGBA images and after packing
+def packing_bytes(element):
+    before = 0
+    after = 0
+    packed = get_packed_types(element)
+    for component in element['components']:
+        if(component['type'] not in gray_maps):
+            continue
+        size = read_image_size(component['path'])
+        if(size is None):
+            continue
+        width, height, channels, depth = size
+        before += width * height * 4 * depth
+        if(component['type'] not in packed):
+            # Float image nodes keep one channel
+            after += width * height * depth
+    for pack in element.get('packs', []):
+        width, height = pack['size']
+        after += width * height * 4
+    return before, after
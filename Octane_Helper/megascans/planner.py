@@ -0,0 +1,140 @@
+import bpy
+import numpy
+from bpy.types import Operator
+from bpy.props import FloatProperty, IntProperty
+
+# Every subdivision level splits a triangle into four
+def subdivided(triangles, level):
+    return triangles * 4 ** level
+
+def mesh_triangles(mesh):
+    counts = numpy.empty(len(mesh.polygons), dtype=numpy.int32)
+    mesh.polygons.foreach_get('loop_total', counts)
+    return int(counts.sum()) - len(counts)
+
+def get_vertex_displacement(mat):
+    if(mat is None or not mat.use_nodes or 'disp' not in mat.node_tree.nodes):
+        return None
+    node = mat.node_tree.nodes['disp']
+    if(node.bl_idname != 'ShaderNodeOctVertexDisplacementTex'):
+        return None
+    return node
+
+# Mesh objects that get rendered with how often they are placed, collection instances included
+def get_placements(context):
+    placements = {}
+    for obj in context.view_layer.objects:
+        if(obj.type == 'MESH'):
+            placements[obj] = placements.get(obj, 0) + 1
+        elif(obj.instance_type == 'COLLECTION' and obj.instance_collection):
+            for source in obj.instance_collection.all_objects:
+                if(source.type == 'MESH'):
+                    placements[source] = placements.get(source, 0) + 1
+    return placements
+
+# Base triangles and current level of every material with vertex displacement
+def get_displacement_rows(context):
+    rows = {}
+    triangles = {}
+    for obj, count in get_placements(context).items():
+        for slot in obj.material_slots:
+            node = get_vertex_displacement(slot.material)
+            if(node is None):
+                continue
+            if(obj.data not in triangles):
+                triangles[obj.data] = mesh_triangles(obj.data)
+            row = rows.setdefault(slot.material.name, {
+                'material': slot.material.name,
+                'level': node.inputs['Subdivision level'].default_value,
+                'objects': 0,
+                'triangles': 0
+            })
+            row['objects'] += count
+            row['triangles'] += triangles[obj.data] * count
+    return sorted(rows.values(), key=lambda row: row['material'])
+
+# Lower the level of the biggest contributor until the scene fits the budget
+def plan_levels(rows, budget, max_level):
+    levels = {row['material']: max_level for row in rows}
+    cost = lambda row: subdivided(row['triangles'], levels[row['material']])
+    total = sum([cost(row) for row in rows])
+    while total > budget:
+        candidates = [row for row in rows if levels[row['material']] > 0]
+        if(not len(candidates)):
+            break
+        row = max(candidates, key=cost)
+        total -= cost(row)
+        levels[row['material']] -= 1
+        total += cost(row)
+    return levels
+
+def format_triangles(count):
+    if(count >= 1000000):
+        return '{:.1f} M'.format(count / 1000000)
+    if(count >= 1000):
+        return '{:.1f} K'.format(count / 1000)
+    return str(count)
+
+class OctaneMSDisplacementPlanner(Operator):
+    bl_label = 'Plan Vertex Displacement'
+    bl_idname = 'octane.ms_disp_planner'
+    bl_description = 'Pick the highest vertex displacement subdivision of every material that keeps the scene within a triangle budget'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    budget: FloatProperty(
+        name='Budget (M triangles)',
+        description='Triangles the whole scene may have after vertex displacement, in millions',
+        min=0.1,
+        default=50
+    )
+
+    max_level: IntProperty(
+        name='Max Subdivision',
+        min=0,
+        max=6,
+        default=6
+    )
+
+    def draw(self, context):
+        layout = self.layout
+        row = layout.row(align=True)
+        row.prop(self, 'budget')
+        row.prop(self, 'max_level')
+        levels = plan_levels(self.rows, self.budget * 1000000, self.max_level)
+        col = layout.column(align=True)
+        row = col.row(align=True)
+        for title in ('Material', 'Objects', 'Base', 'Level', 'Predicted', 'Planned', 'Budgeted'):
+            row.label(text=title)
+        current = 0
+        planned = 0
+        for item in self.rows:
+            row = col.row(align=True)
+            row.label(text=item['material'])
+            row.label(text=str(item['objects']))
+            row.label(text=format_triangles(item['triangles']))
+            row.label(text=str(item['level']))
+            row.label(text=format_triangles(subdivided(item['triangles'], item['level'])))
+            row.label(text=str(levels[item['material']]))
+            row.label(text=format_triangles(subdivided(item['triangles'], levels[item['material']])))
+            current += subdivided(item['triangles'], item['level'])
+            planned += subdivided(item['triangles'], levels[item['material']])
+        layout.label(text='Scene {} triangles now, {} with the plan'.format(format_triangles(current), format_triangles(planned)))
+
+    def execute(self, context):
+        if(not hasattr(self, 'rows')):
+            self.rows = get_displacement_rows(context)
+        levels = plan_levels(self.rows, self.budget * 1000000, self.max_level)
+        for material, level in levels.items():
+            get_vertex_displacement(bpy.data.materials[material]).inputs['Subdivision level'].default_value = level
+        self.report({'INFO'}, 'Planned the displacement of {} materials'.format(len(levels)))
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        prefs = context.preferences.addons['Octane_Helper'].preferences
+        self.budget = prefs.disp_triangle_budget
+        self.max_level = prefs.disp_level_vertex
+        self.rows = get_displacement_rows(context)
+        if(not len(self.rows)):
+            self.report({'INFO'}, 'No material in the scene uses vertex displacement')
+            return {'CANCELLED'}
+        return context.window_manager.invoke_props_dialog(self, width=700)
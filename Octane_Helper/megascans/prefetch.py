@@ -0,0 +1,106 @@
+import os, time, hashlib
+from concurrent.futures import ThreadPoolExecutor
+from . headers import count_obj_triangles
+
+# Leading bytes of the image formats Bridge exports
+image_signatures = {
+    '.png': (b'\x89PNG',),
+    '.jpg': (b'\xff\xd8\xff',),
+    '.jpeg': (b'\xff\xd8\xff',),
+    '.tif': (b'II*\x00', b'MM\x00*'),
+    '.tiff': (b'II*\x00', b'MM\x00*'),
+    '.exr': (b'v/1\x01',)
+}
+
+chunk_size = 1024*1024
+
+prefetch_pool = None
+
+def start_prefetch(workers):
+    global prefetch_pool
+    if(prefetch_pool is None and workers > 0):
+        prefetch_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ms_prefetch')
+
+def stop_prefetch():
+    global prefetch_pool
+    if(prefetch_pool is not None):
+        prefetch_pool.shutdown(wait=False)
+        prefetch_pool = None
+
+# Check a file and read it once so the main thread finds it in the page cache,
+# the triangles of an OBJ are counted on the way for the budget estimate
+def read_file(path, signatures=None, digest=False, triangles=False):
+    start = time.perf_counter()
+    result = {'path': path, 'exists': os.path.isfile(path), 'valid': False, 'bytes': 0, 'seconds': 0, 'digest': None, 'triangles': None}
+    hasher = hashlib.sha1() if digest else None
+    if(result['exists']):
+        with open(path, 'rb') as f:
+            if(hasattr(os, 'posix_fadvise')):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+            header = f.read(32)
+            if(hasher):
+                hasher.update(header)
+            ext = os.path.splitext(path)[1].lower()
+            result['valid'] = (signatures is None or ext not in signatures or header.startswith(signatures[ext]))
+            result['bytes'] = len(header)
+            # Bytes after the last complete line, counted with the next chunk
+            rest = header
+            if(triangles):
+                result['triangles'] = 0
+            while True:
+                data = f.read(chunk_size)
+                if not data:
+                    break
+                result['bytes'] += len(data)
+                if(hasher):
+                    hasher.update(data)
+                if(triangles):
+                    data = rest + data
+                    cut = data.rfind(b'\n') + 1
+                    result['triangles'] += count_obj_triangles(data[:cut])
+                    rest = data[cut:]
+            if(triangles):
+                result['triangles'] += count_obj_triangles(rest)
+            if(hasher):
+                result['digest'] = hasher.hexdigest()
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+# Start reading every texture and mesh of an element in the background
+def prefetch_element(element):
+    element['prefetch'] = {}
+    # Paths whose read is already in the timings, a file is looked up several times per import
+    element['prefetch_counted'] = set()
+    element['timings'] = {'io': 0, 'wait': 0, 'mesh_io': 0, 'mesh_wait': 0, 'datablock': 0, 'mesh': 0}
+    if(prefetch_pool is None):
+        return
+    for component in element['components']:
+        # The digests tell a changed map from one Bridge only wrote again
+        element['prefetch'][component['path']] = prefetch_pool.submit(read_file, component['path'], image_signatures, True)
+    for mesh in element['meshes']:
+        element['prefetch'][mesh['path']] = prefetch_pool.submit(read_file, mesh['path'], None, True, mesh['path'].lower().endswith('.obj'))
+
+# The result if the file has been read already, never waits for it
+def peek_prefetched(element, path):
+    future = element.get('prefetch', {}).get(path)
+    if(future is None or not future.done() or future.exception() is not None):
+        return None
+    return future.result()
+
+# Block until the file has been read, returns None if it was never queued
+def get_prefetched(element, path):
+    future = element.get('prefetch', {}).get(path)
+    if(future is None):
+        return None
+    start = time.perf_counter()
+    try:
+        result = future.result()
+    except OSError as e:
+        result = {'path': path, 'exists': False, 'valid': False, 'bytes': 0, 'seconds': 0, 'digest': None}
+        print('[Octane Helper] Failed to read {}: {}'.format(path, str(e)))
+    if(path not in element['prefetch_counted']):
+        element['prefetch_counted'].add(path)
+        prefix = 'mesh_' if path in [mesh['path'] for mesh in element['meshes']] else ''
+        element['timings'][prefix + 'wait'] += time.perf_counter() - start
+        element['timings'][prefix + 'io'] += result['seconds']
+    return result
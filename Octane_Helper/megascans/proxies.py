@@ -0,0 +1,115 @@
+import bpy
+import os
+import json
+import hashlib
+from bpy.app.handlers import persistent
+from . images import load_image, normalize_path
+from . meshcache import get_cache_dir
+
+# Proxies of float and 16 bit maps are written as EXR, PNG would quantize displacements and normals to 8 bits
+proxy_formats = {'.png': 'PNG', '.exr': 'OPEN_EXR'}
+
+def get_proxy_base(prefs, path, size):
+    stat = os.stat(path)
+    key = hashlib.sha1('|'.join([normalize_path(path), str(stat.st_size), str(stat.st_mtime), str(size)]).encode()).hexdigest()
+    return os.path.join(get_cache_dir(prefs, 'proxies'), key)
+
+def find_proxy(base):
+    for ext in proxy_formats:
+        if(os.path.isfile(base + ext)):
+            return base + ext
+    return None
+
+def read_proxy_info(proxy_path):
+    with open(proxy_path[:-4] + '.json') as f:
+        return json.load(f)
+
+# Write a downsampled copy of the image once, later imports find it on disk
+def make_proxy(prefs, path, size=None):
+    size = size or prefs.proxy_size
+    base = get_proxy_base(prefs, path, size)
+    proxy_path = find_proxy(base)
+    if(proxy_path):
+        return proxy_path, read_proxy_info(proxy_path)
+    # The full resolution pixels are only needed to write the proxy, never keep them around
+    count = len(bpy.data.images)
+    image = bpy.data.images.load(path, check_existing=True)
+    is_new = (len(bpy.data.images) > count)
+    try:
+        width, height = image.size
+        info = {'width': width, 'height': height, 'channels': image.channels, 'float': image.is_float}
+        scale = size / max(width, height, 1)
+        if(scale >= 1):
+            return None, info
+        # Blender holds 16 bit files in float buffers too, they keep their precision in a float EXR
+        proxy_path = base + ('.exr' if image.is_float else '.png')
+        proxy = image.copy()
+        proxy.scale(max(1, int(width * scale)), max(1, int(height * scale)))
+        proxy.filepath_raw = proxy_path
+        proxy.file_format = proxy_formats[proxy_path[-4:]]
+        proxy.save()
+        bpy.data.images.remove(proxy)
+    finally:
+        if(is_new):
+            bpy.data.images.remove(image)
+        else:
+            image.buffers_free()
+    with open(proxy_path[:-4] + '.json', 'w') as f:
+        json.dump(info, f)
+    return proxy_path, info
+
+def image_info_bytes(info, width, height):
+    return width * height * info['channels'] * (4 if info['float'] else 1)
+
+# Point the node at the proxy and remember the full resolution file for final renders
+def use_proxy(prefs, texNode, path):
+    proxy_path, info = make_proxy(prefs, path)
+    if(proxy_path is None):
+        texNode.image = load_image(path)
+        return 0
+    texNode.image = load_image(proxy_path)
+    texNode['ms_full_path'] = path
+    texNode['ms_proxy_path'] = proxy_path
+    full = image_info_bytes(info, info['width'], info['height'])
+    return full - image_info_bytes(info, texNode.image.size[0], texNode.image.size[1])
+
+def get_proxy_nodes():
+    for mat in bpy.data.materials:
+        if(mat.node_tree):
+            for node in mat.node_tree.nodes:
+                if('ms_full_path' in node):
+                    yield node
+
+def swap_proxies(full):
+    rendered = set()
+    for node in get_proxy_nodes():
+        path = node['ms_full_path'] if full else node['ms_proxy_path']
+        if(os.path.isfile(path)):
+            if(not full and node.image is not None):
+                rendered.add(node.image.name)
+            node.image = load_image(path)
+    # The full resolution pixels were only needed for the render, free them or the proxies save nothing
+    if(len(rendered)):
+        rendered -= set([node.image.name for node in get_proxy_nodes() if node.image])
+    for name in rendered:
+        if(name in bpy.data.images):
+            bpy.data.images[name].buffers_free()
+
+@persistent
+def proxies_render_pre(*args):
+    swap_proxies(True)
+
+# Swapped back once the whole render job is over, not after every frame of an animation
+@persistent
+def proxies_render_complete(*args):
+    swap_proxies(False)
+
+def register_proxies():
+    bpy.app.handlers.render_pre.append(proxies_render_pre)
+    bpy.app.handlers.render_complete.append(proxies_render_complete)
+    bpy.app.handlers.render_cancel.append(proxies_render_complete)
+
+def unregister_proxies():
+    bpy.app.handlers.render_cancel.remove(proxies_render_complete)
+    bpy.app.handlers.render_complete.remove(proxies_render_complete)
+    bpy.app.handlers.render_pre.remove(proxies_render_pre)
@@ -0,0 +1,46 @@
+import bpy
+from . helpers import get_disp_type
+
+# Asset id and signature to material name, verified against the datablock before use
+material_index = {}
+material_index_ready = False
+
+# Everything that changes the node graph built for an asset
+def material_signature(element, prefs):
+    textures = sorted([component['type'] for component in element['components']])
+    return '|'.join([
+        ','.join(textures),
+        get_disp_type(prefs, element),
+        str(prefs.disp_level_vertex),
+        str(prefs.use_projection_surface),
+        prefs.surface_projection,
+        prefs.brdf_model,
+        str(prefs.use_texture_proxies),
+        str(prefs.proxy_size),
+        str(prefs.use_channel_packing),
+        str(element.get('texture_size', 0))
+    ])
+
+def find_material(aid, signature):
+    if(not material_index_ready):
+        rebuild_material_index()
+    name = material_index.get((aid, signature))
+    if(name in bpy.data.materials):
+        mat = bpy.data.materials[name]
+        if(mat.get('ms_id') == aid and mat.get('ms_signature') == signature):
+            return mat
+    return None
+
+# Materials saved in the file still carry their keys, indexed once per file instead of on every miss
+def rebuild_material_index():
+    global material_index_ready
+    material_index.clear()
+    for mat in bpy.data.materials:
+        if('ms_id' in mat and 'ms_signature' in mat):
+            material_index[(mat['ms_id'], mat['ms_signature'])] = mat.name
+    material_index_ready = True
+
+def register_material(mat, aid, signature):
+    mat['ms_id'] = aid
+    mat['ms_signature'] = signature
+    material_index[(aid, signature)] = mat.name
@@ -0,0 +1,116 @@
+import bpy
+import os
+import re
+import json
+from . prefetch import get_prefetched
+from . meshcache import file_digest
+from . helpers import set_component_image
+from . packing import plan_packs, get_packed_types, make_packed
+
+# Size and modification time, cheap enough to check every file of every import
+def file_stamp(path):
+    stat = os.stat(path)
+    return '{}:{}'.format(stat.st_size, stat.st_mtime_ns)
+
+# What a file was when it got imported, the digest comes from the prefetch when it has one
+def get_file_state(element, path):
+    result = get_prefetched(element, path)
+    return [file_stamp(path), result['digest'] if result else None]
+
+# Bridge writes every file of an export again, only a different content counts as a change
+def is_file_changed(element, path, state):
+    if(state is None):
+        return True
+    if(file_stamp(path) == state[0]):
+        return False
+    result = get_prefetched(element, path)
+    digest = result['digest'] if result and result['digest'] else file_digest(path)
+    return digest != state[1]
+
+def store_material_files(mat, element):
+    mat['ms_files'] = json.dumps({component['path']: get_file_state(element, component['path']) for component in element['components'] if os.path.isfile(component['path'])})
+
+# Point the nodes of a reused material at the maps that changed on disk, the images reload themselves
+def refresh_material_steps(prefs, mat, element):
+    files = json.loads(mat.get('ms_files', '{}'))
+    components = [component for component in element['components'] if os.path.isfile(component['path'])]
+    changed = [component['type'] for component in components if is_file_changed(element, component['path'], files.get(component['path']))]
+    if(not len(changed)):
+        return 0
+    nodes = mat.node_tree.nodes
+    plan_packs(prefs, element)
+    packed = get_packed_types(element)
+    for component in components:
+        if(component['type'] in changed and component['type'] not in packed and component['type'] in nodes):
+            set_component_image(prefs, element, nodes[component['type']], component['path'])
+            yield
+    for pack in element['packs']:
+        if(pack['name'] in nodes and len(set(pack['types']) & set(changed))):
+            set_component_image(prefs, element, nodes[pack['name']], make_packed(prefs, pack))
+            yield
+    store_material_files(mat, element)
+    print('[Octane Helper] Reloaded {} of {}'.format(', '.join(changed), mat.name))
+    return len(changed)
+
+# Asset id to the names of its objects, verified against the datablocks before use
+asset_index = {}
+asset_index_ready = False
+
+# Remember which asset and file the objects come from, re-imports update them in place
+def tag_mesh_objects(objs, element, mesh_path):
+    state = json.dumps(get_file_state(element, mesh_path))
+    for obj in objs:
+        obj['ms_id'] = element['id']
+        obj['ms_mesh_path'] = mesh_path
+        obj['ms_mesh_state'] = state
+        asset_index.setdefault(element['id'], set()).add(obj.name)
+
+def is_asset_object(obj, aid):
+    return obj is not None and obj.get('ms_id') == aid and 'ms_mesh_path' in obj
+
+def find_asset_objects(scene, aid):
+    if(not asset_index_ready):
+        rebuild_asset_index()
+    names = asset_index.get(aid, set())
+    objs = [bpy.data.objects.get(name) for name in names]
+    # A renamed or deleted object leaves a stale name, index the file again once
+    if(not all([is_asset_object(obj, aid) for obj in objs])):
+        rebuild_asset_index()
+        names = asset_index.get(aid, set())
+    return [scene.objects[name] for name in sorted(names) if is_asset_object(scene.objects.get(name), aid)]
+
+# Objects saved in the file still carry their asset id, indexed once per file instead of on every import
+def rebuild_asset_index():
+    global asset_index_ready
+    asset_index.clear()
+    for obj in bpy.data.objects:
+        if('ms_id' in obj and 'ms_mesh_path' in obj):
+            asset_index.setdefault(obj['ms_id'], set()).add(obj.name)
+    asset_index_ready = True
+
+def is_mesh_changed(element, mesh_path, objs):
+    if(not os.path.isfile(mesh_path)):
+        return False
+    return is_file_changed(element, mesh_path, json.loads(objs[0].get('ms_mesh_state', 'null')))
+
+def base_name(name):
+    return re.sub(r'\.\d{3}$', '', name)
+
+# Give the existing objects the data of a new import, matched by name and then by order,
+# they keep their placement, parents and modifiers. The new objects are removed.
+def swap_mesh_data(old_objs, new_objs):
+    new_by_name = {base_name(obj.name): obj for obj in new_objs}
+    unused = []
+    for index, obj in enumerate(old_objs):
+        new = new_by_name.get(base_name(obj.name))
+        if(new is None and index < len(new_objs)):
+            new = new_objs[index]
+        if(new is None or new.type != obj.type or new.data is None):
+            continue
+        unused.append(obj.data)
+        obj.data = new.data
+    # The new objects were tagged on import, their names would send the next lookup into a rebuild
+    for obj in new_objs:
+        asset_index.get(obj.get('ms_id'), set()).discard(obj.name)
+    bpy.data.batch_remove(new_objs)
+    bpy.data.batch_remove([data for data in set(unused) if data.users == 0])
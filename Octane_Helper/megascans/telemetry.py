@@ -0,0 +1,100 @@
+import time
+import json
+import threading
+import itertools
+from collections import deque
+
+# Bounded history of import stages, appending to a deque is safe from any thread
+telemetry = deque(maxlen=10000)
+
+# Events keep their number when the oldest ones fall out of the deque
+event_numbers = itertools.count()
+
+stages = ['receive', 'queue', 'parse', 'mesh', 'image', 'material', 'asset']
+
+def set_telemetry_size(size):
+    global telemetry
+    if(telemetry.maxlen != size):
+        telemetry = deque(telemetry, maxlen=size)
+
+def record(stage, asset, start, duration, **counts):
+    telemetry.append({
+        'seq': next(event_numbers),
+        'stage': stage,
+        'asset': asset,
+        'start': start,
+        'duration': duration,
+        'thread': threading.get_ident(),
+        'counts': counts
+    })
+
+# Time a block with the monotonic clock, counts can be added to the returned dict inside the block
+class timed_stage():
+    def __init__(self, stage, asset, **counts):
+        self.stage = stage
+        self.asset = asset
+        self.counts = counts
+
+    def __enter__(self):
+        self.start = time.monotonic()
+        return self.counts
+
+    def __exit__(self, *args):
+        record(self.stage, self.asset, self.start, time.monotonic() - self.start, **self.counts)
+        return False
+
+# Measured seconds per unit of a stage count, None until there is something to measure
+def stage_rate(stage, key):
+    events = [event for event in list(telemetry) if event['stage'] == stage and event['counts'].get(key)]
+    if(not len(events)):
+        return None
+    return sum([event['duration'] for event in events]) / sum([event['counts'][key] for event in events])
+
+def event_count():
+    return len(telemetry)
+
+def percentile(values, fraction):
+    if(not len(values)):
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+# Per stage totals for the panel
+def summarize():
+    events = list(telemetry)
+    result = []
+    for stage in stages:
+        durations = [event['duration'] for event in events if event['stage'] == stage]
+        counts = {}
+        for event in events:
+            if(event['stage'] == stage):
+                for key, value in event['counts'].items():
+                    counts[key] = counts.get(key, 0) + value
+        result.append({
+            'stage': stage,
+            'events': len(durations),
+            'total': sum(durations),
+            'p50': percentile(durations, 0.5),
+            'p95': percentile(durations, 0.95),
+            'counts': counts
+        })
+    return result
+
+def export_json(filepath):
+    with open(filepath, 'w') as f:
+        json.dump({'events': list(telemetry), 'summary': summarize()}, f, indent=1)
+
+# Chrome trace event format, open it in chrome://tracing or Perfetto
+def export_chrome_trace(filepath):
+    events = [{
+        'name': event['stage'],
+        'cat': 'megascans',
+        'ph': 'X',
+        'ts': event['start'] * 1000000,
+        'dur': event['duration'] * 1000000,
+        'pid': 1,
+        'tid': event['thread'],
+        'args': dict(event['counts'], asset=event['asset'])
+    } for event in list(telemetry)]
+    with open(filepath, 'w') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
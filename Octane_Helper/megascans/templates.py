@@ -0,0 +1,59 @@
+import bpy
+import hashlib
+from . helpers import get_disp_type
+
+# Node graphs built for Megascans materials, copied for every later asset with the same layout.
+# Template key to material name, the templates are hidden materials without users.
+template_index = {}
+
+# Everything that changes the nodes and links of the graph, per asset values are set after copying
+def template_signature(element, prefs):
+    textures = sorted([component['type'] for component in element['components']])
+    use_projection = (('surface' in element['categories'] or 'surface' in element['tags']) and prefs.use_projection_surface)
+    return '|'.join([
+        ','.join(textures),
+        get_disp_type(prefs, element),
+        str(prefs.disp_level_vertex),
+        str(use_projection),
+        prefs.surface_projection if use_projection else '',
+        prefs.brdf_model,
+        str(element['category'] == 'Metal'),
+        str(prefs.use_channel_packing),
+        ';'.join([','.join(pack['types']) for pack in element.get('packs', [])])
+    ])
+
+def find_template(key):
+    name = template_index.get(key)
+    if(name in bpy.data.materials and bpy.data.materials[name].get('ms_template') == key):
+        return bpy.data.materials[name]
+    template_index.pop(key, None)
+    return None
+
+# Keep a copy of a freshly built material without its images
+def store_template(mat, key):
+    template = mat.copy()
+    template.name = '.MS_Template_' + hashlib.sha1(key.encode()).hexdigest()[:12]
+    template['ms_template'] = key
+    for prop in ('ms_id', 'ms_signature'):
+        if(prop in template):
+            del template[prop]
+    for node in template.node_tree.nodes:
+        if(node.bl_idname in ('ShaderNodeOctImageTex', 'ShaderNodeOctFloatImageTex')):
+            node.image = None
+            for prop in ('ms_full_path', 'ms_proxy_path'):
+                if(prop in node):
+                    del node[prop]
+    template_index[key] = template.name
+    return template
+
+def copy_template(template, name):
+    mat = template.copy()
+    mat.name = name
+    del mat['ms_template']
+    return mat
+
+def clear_templates():
+    templates = [mat for mat in bpy.data.materials if 'ms_template' in mat]
+    bpy.data.batch_remove(templates)
+    template_index.clear()
+    return len(templates)
@@ -1,77 +1,249 @@
-import bpy, threading, os, time, json, socket
+import threading, os, time, json, socket, selectors, re, itertools
+
+# Bytes that matter while scanning outside and inside JSON strings
+outside_string = re.compile(rb'["{}]')
+inside_string = re.compile(rb'["\\]')
+
+spool_numbers = itertools.count()
+
+class ms_Spool():
+
+    #Write the payload of one connection to disk as it arrives, next to an index of its asset byte ranges.
+    #The process id in the name tells the spools of a crashed session from the ones still being written.
+    def __init__(self, journal_dir):
+        base = os.path.join(journal_dir, 'payload_{}_{}_{}'.format(os.getpid(), int(time.time() * 1000), next(spool_numbers)))
+        self.path = base + '.spool'
+        self.file = open(self.path, 'wb')
+        self.index = open(base + '.index', 'w')
+
+    def write(self, data):
+        self.file.write(data)
+
+    #Journal an asset, returns the key the importer marks it done with.
+    def add(self, start, end):
+        try:
+            #The index must never point past what is on disk.
+            self.file.flush()
+            self.index.write('{} {}\n'.format(start, end))
+            self.index.flush()
+            return [self.path, start]
+        except OSError as e:
+            print( "[Octane Helper] Octane Megascans Module Error writing the payload journal. Error: ", str(e) )
+            return None
+
+    def close(self):
+        try:
+            self.file.close()
+            self.index.write('closed\n')
+            self.index.close()
+        except OSError:
+            pass
+
+class ms_Decoder():
+
+    #Incrementally split the JSON array sent by Bridge into its asset objects.
+    #Only the undecoded tail is kept, so memory stays at the size of one asset.
+    def __init__(self):
+        self.buffer = bytearray()
+        self.received = 0
+        self.count = 0
+        self.started = None
+        self.record = None
+        self.spool = None
+        #Payload offset of the first buffered byte and the payload ranges of the assets the last feed completed.
+        self.offset = 0
+        self.spans = []
+        self.pos = 0
+        self.start = -1
+        self.depth = 0
+        self.in_string = False
+
+    #Append a chunk and return the asset objects it completed.
+    def feed(self, data):
+        if self.started is None:
+            self.started = time.monotonic()
+        self.buffer += data
+        self.received += len(data)
+        elements = []
+        self.spans = []
+        buffer = self.buffer
+        while True:
+            if self.in_string:
+                match = inside_string.search(buffer, self.pos)
+                if match is None:
+                    self.pos = len(buffer)
+                    break
+                if match.group() == b'\\':
+                    #Skip the escaped byte, wait for it if it has not arrived yet.
+                    if match.end() >= len(buffer):
+                        self.pos = match.start()
+                        break
+                    self.pos = match.end() + 1
+                    continue
+                self.in_string = False
+                self.pos = match.end()
+                continue
+
+            match = outside_string.search(buffer, self.pos)
+            if match is None:
+                self.pos = len(buffer)
+                break
+            self.pos = match.end()
+            token = match.group()
+            if token == b'"':
+                self.in_string = True
+            elif token == b'{':
+                if self.depth == 0:
+                    self.start = match.start()
+                self.depth += 1
+            elif self.depth > 0:
+                self.depth -= 1
+                if self.depth == 0:
+                    try:
+                        #The decode is the parse cost, the importer records it as the element's parse stage.
+                        decode_start = time.monotonic()
+                        element = json.loads(bytes(buffer[self.start:self.pos]))
+                        if isinstance(element, dict):
+                            element['ms_parse'] = [decode_start, time.monotonic() - decode_start, self.pos - self.start]
+                        elements.append(element)
+                        self.spans.append((self.offset + self.start, self.offset + self.pos))
+                    except ValueError as e:
+                        print( "[Octane Helper] Octane Megascans Module Error decoding an asset. Error: ", str(e) )
+                    #Drop everything decoded so far.
+                    del buffer[:self.pos]
+                    self.offset += self.pos
+                    self.pos = 0
+                    self.start = -1
+        self.count += len(elements)
+        if self.depth == 0 and self.start == -1 and self.pos:
+            #Only separators are left before pos.
+            del buffer[:self.pos]
+            self.offset += self.pos
+            self.pos = 0
+        return elements
+
+    #True when the stream stopped in the middle of an asset.
+    def is_incomplete(self):
+        return self.depth > 0 or self.in_string
 
 class ms_Init(threading.Thread):
     
-	#Initialize the thread and assign the method (i.e. importer) to be called when it receives JSON data.
-    def __init__(self, importer):
+	#Initialize the thread and assign the method (i.e. importer) to be called with every decoded asset.
+	#The optional reporter is called with the bytes, seconds and assets of every finished connection.
+	#With a record_dir every payload is also written there as it arrives, for the replay harness.
+	#With a journal_dir every payload is spooled there and its assets are journaled until they are imported.
+    def __init__(self, importer, port=28888, buffer_size=4096*2, reporter=None, record_dir='', journal_dir=''):
         threading.Thread.__init__(self)
         self.importer = importer
+        self.reporter = reporter
+        self.record_dir = record_dir
+        self.journal_dir = journal_dir
+        self.port = port
+        self.buffer_size = buffer_size
+        self.daemon = True
+        self.error = None
+        self.ready = threading.Event()
+        #Writing to the wakeup socket ends the select loop, so the thread never has to poll.
+        self.wakeup_read, self.wakeup_write = socket.socketpair()
+
+	#Ask the server to stop from any thread.
+    def stop(self):
+        try:
+            self.wakeup_write.send(b'\x00')
+        except OSError:
+            pass
 
 	#Start the thread to start listing to the port.
     def run(self):
         try:
             run_livelink = True
-            host, port = 'localhost', 28888
+            host, port = 'localhost', self.port
+            selector = selectors.DefaultSelector()
             #Making a socket object.
             socket_ = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            #Allow a restart while closed connections are still in TIME_WAIT.
+            if os.name != 'nt':
+                socket_.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             #Binding the socket to host and port number mentioned at the start.
             socket_.bind((host, port))
+            #Port 0 lets the system pick one, sessions behind the broker listen like that.
+            self.port = socket_.getsockname()[1]
+            socket_.listen(5)
+            socket_.setblocking(False)
+            #The listening socket carries no decoder, every client gets its own one.
+            selector.register(socket_, selectors.EVENT_READ, None)
+            selector.register(self.wakeup_read, selectors.EVENT_READ, self)
+            self.ready.set()
 
-            #Run until the thread starts receiving data.
+            #Serve every connected client until someone says goodbye.
             while run_livelink:
-                socket_.listen(5)
-                #Accept connection request.
-                client, addr = socket_.accept()
-                data = ""
-                buffer_size = 4096*2
-                #Receive data from the client. 
-                data = client.recv(buffer_size)
-                if data == b'Bye Megascans':
-                    run_livelink = False
-                    break
-
-                #If any data is received over the port.
-                if data != "":
-                    self.TotalData = b""
-                    self.TotalData += data #Append the previously received data to the Total Data.
-                    #Keep running until the connection is open and we are receiving data.
-                    while run_livelink:
-                        #Keep receiving data from client.
-                        data = client.recv(4096*2)
-                        if data == b'Bye Megascans':
-                            run_livelink = False
-                            break
-                        #if we are getting data keep appending it to the Total data.
-                        if data : self.TotalData += data
-                        else:
-                            #Once the data transmission is over call the importer method and send the collected TotalData.
-                            self.importer(self.TotalData)
-                            break
-        except Exception as e:
-            print( "[Octane Helper] Octane Megascans Module Error initializing the thread. Error: ", str(e) )
+                for key, mask in selector.select():
+                    if key.data is None:
+                        #Accept connection request.
+                        client, addr = socket_.accept()
+                        client.setblocking(False)
+                        selector.register(client, selectors.EVENT_READ, ms_Decoder())
+                        continue
+                    if key.data is self:
+                        run_livelink = False
+                        break
 
-class thread_checker(threading.Thread):
-    
-	#Initialize the thread and assign the method (i.e. importer) to be called when it receives JSON data.
-    def __init__(self):
-        threading.Thread.__init__(self)
+                    client, decoder = key.fileobj, key.data
+                    #Receive whatever the client has sent so far.
+                    try:
+                        data = client.recv(self.buffer_size)
+                    except (BlockingIOError, InterruptedError):
+                        continue
+                    except OSError:
+                        data = b''
 
-	#Start the thread to start listing to the port.
-    def run(self):
-        try:
-            run_checker = True
-            while run_checker:
-                time.sleep(3)
-                for i in threading.enumerate():
-                    if(i.getName() == "MainThread" and i.is_alive() == False):
-                        host, port = 'localhost', 28888
-                        s = socket.socket()
-                        s.connect((host,port))
-                        data = "Bye Megascans"
-                        s.send(data.encode())
-                        s.close()
-                        run_checker = False
+                    if not decoder.received and data == b'Bye Megascans':
+                        run_livelink = False
                         break
+
+                    #Keep a raw copy of the payload.
+                    if data and self.record_dir:
+                        if decoder.record is None:
+                            decoder.record = open(os.path.join(self.record_dir, 'payload_{}_{}.json'.format(int(time.time() * 1000), id(decoder))), 'wb')
+                        decoder.record.write(data)
+
+                    #Spool the payload so assets that were not imported survive a crash.
+                    if data and self.journal_dir:
+                        try:
+                            if decoder.spool is None:
+                                decoder.spool = ms_Spool(self.journal_dir)
+                            decoder.spool.write(data)
+                        except OSError as e:
+                            print( "[Octane Helper] Octane Megascans Module Error writing the payload journal, journaling stops. Error: ", str(e) )
+                            self.journal_dir = ''
+                            decoder.spool = None
+
+                    #Hand every asset over as soon as its JSON object is complete.
+                    if data:
+                        for element, span in zip(decoder.feed(data), decoder.spans):
+                            if decoder.spool:
+                                element['ms_journal'] = decoder.spool.add(*span)
+                            self.importer(element)
+                    else:
+                        #Once the data transmission is over forget about the client.
+                        selector.unregister(client)
+                        client.close()
+                        if decoder.record:
+                            decoder.record.close()
+                        if decoder.spool:
+                            decoder.spool.close()
+                        if decoder.is_incomplete():
+                            print( "[Octane Helper] Octane Megascans Module Error: Bridge closed the connection in the middle of an asset" )
+                        if self.reporter and decoder.started is not None:
+                            self.reporter(decoder.started, time.monotonic() - decoder.started, decoder.received, decoder.count)
+
+            for key in list(selector.get_map().values()):
+                key.fileobj.close()
+            selector.close()
         except Exception as e:
-            print( "[Octane Helper] Octane Megascans Module Error initializing thread checker. Error: ", str(e) )
-            pass
+            self.error = e
+            print( "[Octane Helper] Octane Megascans Module Error initializing the thread. Error: ", str(e) )
+        finally:
+            self.wakeup_read.close()
+            self.wakeup_write.close()
+            self.ready.set()
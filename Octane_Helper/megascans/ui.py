@@ -0,0 +1,74 @@
+import bpy
+from bpy.types import Operator
+from bpy.props import StringProperty, EnumProperty
+from . telemetry import summarize, export_json, export_chrome_trace, event_count
+
+class OctaneMSTelemetry(Operator):
+    bl_label = 'Megascans Import Stats'
+    bl_idname = 'octane.ms_telemetry'
+    bl_description = 'Time spent in every stage of the recent Megascans imports'
+    bl_options = {'REGISTER'}
+
+    def draw(self, context):
+        layout = self.layout
+        col = layout.column(align=True)
+        row = col.row(align=True)
+        for title in ('Stage', 'Events', 'Total', 'p50', 'p95', 'Counts'):
+            row.label(text=title)
+        for stage in summarize():
+            row = col.row(align=True)
+            row.label(text=stage['stage'].capitalize())
+            row.label(text=str(stage['events']))
+            row.label(text='{:.2f} s'.format(stage['total']))
+            row.label(text='{:.0f} ms'.format(stage['p50'] * 1000))
+            row.label(text='{:.0f} ms'.format(stage['p95'] * 1000))
+            row.label(text=', '.join(['{} {}'.format(format_count(key, value), key) for key, value in stage['counts'].items()]))
+        layout.separator()
+        row = layout.row(align=True)
+        row.operator('octane.ms_export_telemetry', text='Export JSON', icon='EXPORT').export_format = 'JSON'
+        row.operator('octane.ms_export_telemetry', text='Export Chrome Trace', icon='EXPORT').export_format = 'CHROME'
+
+    def execute(self, context):
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        wm = context.window_manager
+        return wm.invoke_props_dialog(self, width=700)
+
+def format_count(key, value):
+    if('bytes' in key):
+        return '{:.1f} MB'.format(value / (1024 * 1024))
+    return str(value)
+
+class OctaneMSExportTelemetry(Operator):
+    bl_label = 'Export Megascans Import Stats'
+    bl_idname = 'octane.ms_export_telemetry'
+    bl_description = 'Save the recorded Megascans import stages to a file'
+    bl_options = {'REGISTER'}
+
+    filepath: StringProperty(subtype="FILE_PATH")
+    filter_glob: StringProperty(default="*.json", options={"HIDDEN"})
+    export_format: EnumProperty(
+        name='Format',
+        items=[
+            ('JSON', 'JSON', 'Raw events and per stage summary'),
+            ('CHROME', 'Chrome Trace', 'Trace events for chrome://tracing or Perfetto')
+        ],
+        default='JSON'
+    )
+
+    def execute(self, context):
+        if self.filepath == '':
+            return {'CANCELLED'}
+        filepath = bpy.path.ensure_ext(self.filepath, '.json')
+        if(self.export_format == 'CHROME'):
+            export_chrome_trace(filepath)
+        else:
+            export_json(filepath)
+        self.report({'INFO'}, 'Saved {} events to {}'.format(event_count(), filepath))
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        self.filepath = 'megascans_trace.json' if self.export_format == 'CHROME' else 'megascans_stats.json'
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
@@ -0,0 +1,110 @@
+import bpy
+import os
+import uuid
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from . meshcache import get_cache_dir, get_cache_file, file_digest, load_cached_mesh, evict_cache
+
+# Mesh files are imported by background Blender processes, one per worker, the threads only wait on them
+worker_script = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'mesh_worker.py')
+worker_formats = ('fbx', 'obj')
+
+worker_pool = None
+worker_count = 0
+# Mesh path to the future of its .blend file
+worker_jobs = {}
+worker_processes = set()
+
+def start_workers(count):
+    global worker_pool, worker_count
+    if(worker_pool is not None and worker_count == count):
+        return
+    if(worker_pool is not None):
+        # Running jobs finish on the old pool
+        worker_pool.shutdown(wait=False)
+        worker_pool = None
+    if(count > 0):
+        worker_pool = ThreadPoolExecutor(max_workers=count, thread_name_prefix='ms_worker')
+    worker_count = count
+
+def stop_workers():
+    global worker_pool, worker_count
+    for process in list(worker_processes):
+        process.kill()
+    if(worker_pool is not None):
+        worker_pool.shutdown(wait=False)
+        worker_pool = None
+    worker_count = 0
+    worker_jobs.clear()
+
+def run_worker(blender, mesh_path, mesh_format, out_path, timeout):
+    process = subprocess.Popen([blender, '-b', '--factory-startup', '--python', worker_script, '--', mesh_path, mesh_format, out_path],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True)
+    worker_processes.add(process)
+    try:
+        output, errors = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+        raise RuntimeError('timed out after {} s'.format(timeout))
+    finally:
+        worker_processes.discard(process)
+    if(process.returncode != 0 or not os.path.isfile(out_path)):
+        lines = [line for line in errors.splitlines() if line.strip()]
+        raise RuntimeError(lines[-1] if len(lines) else 'exit code {}'.format(process.returncode))
+    return out_path
+
+# Runs on a pool thread, the digest comes from the prefetch when it has one
+def run_job(blender, mesh_path, mesh_format, cache_dir, version, prefetch, timeout):
+    if(cache_dir is None):
+        out_path = os.path.join(tempfile.gettempdir(), 'ms_worker_{}.blend'.format(uuid.uuid4().hex))
+    else:
+        result = prefetch.result() if prefetch else None
+        digest = result['digest'] if result and result['digest'] else file_digest(mesh_path)
+        out_path = get_cache_file(cache_dir, digest, mesh_format, version)
+        if(os.path.isfile(out_path)):
+            return out_path
+    return run_worker(blender, mesh_path, mesh_format, out_path, timeout)
+
+# Start importing the meshes of an element in the background, meshes already submitted are skipped
+def submit_meshes(prefs, element, meshes):
+    start_workers(prefs.mesh_workers)
+    if(worker_pool is None):
+        return
+    cache_dir = get_cache_dir(prefs) if prefs.use_mesh_cache else None
+    for mesh in meshes:
+        mesh_path = mesh['path']
+        mesh_format = mesh['format'].lower()
+        if(mesh_format not in worker_formats or mesh_path in worker_jobs or not os.path.isfile(mesh_path)):
+            continue
+        worker_jobs[mesh_path] = worker_pool.submit(run_job, bpy.app.binary_path, mesh_path, mesh_format, cache_dir,
+            bpy.app.version_string, element.get('prefetch', {}).get(mesh_path), prefs.mesh_worker_timeout)
+
+# Wait for the worker of a mesh while letting the import job run, returns None when none was started
+def wait_worker_steps(mesh_path):
+    future = worker_jobs.get(mesh_path)
+    if(future is None):
+        return None
+    try:
+        while True:
+            try:
+                return future.result(timeout=0.01)
+            except TimeoutError:
+                yield
+    finally:
+        worker_jobs.pop(mesh_path, None)
+
+# The mesh is not needed after all, a job that already runs still fills the cache
+def cancel_worker_job(mesh_path):
+    future = worker_jobs.pop(mesh_path, None)
+    if(future is not None):
+        future.cancel()
+
+def load_worker_mesh(prefs, blend_path):
+    objects = load_cached_mesh(blend_path)
+    if(prefs.use_mesh_cache):
+        evict_cache(os.path.dirname(blend_path), prefs.mesh_cache_size * 1024 * 1024)
+    else:
+        os.remove(blend_path)
+    return objects
@@ -19,6 +19,7 @@ classes = (
     OctaneBasicMaterialsMenu,
     OctaneEnvironmentMenu,
     OctaneRenderMenu,
+    OctaneMegascansMenu,
     OctaneInfoMenu,
     OctaneLightListItem,
     OCTANE_UL_light_list,
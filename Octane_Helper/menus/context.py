@@ -27,6 +27,7 @@ class VIEW3D_MT_object_octane(Menu):
         layout.menu(OctaneMaterialsMenu.bl_idname, icon='MATSPHERE')
         layout.menu(OctaneEnvironmentMenu.bl_idname, icon='MAT_SPHERE_SKY')
         layout.menu(OctaneRenderMenu.bl_idname, icon='RESTRICT_RENDER_OFF')
+        layout.menu(OctaneMegascansMenu.bl_idname, icon='IMPORT')
         layout.menu(OctaneInfoMenu.bl_idname, icon='QUESTION')
 
 class VIEW3D_MT_edit_mesh_octane(Menu):
@@ -225,6 +226,28 @@ class OctaneRenderMenu(Menu):
         layout.separator()
         layout.operator('octane.open_compositor', icon='NODE_COMPOSITING')
 
+class OctaneMegascansMenu(Menu):
+    bl_label = 'Megascans'
+    bl_idname = 'OCTANE_MT_megascans'
+
+    def draw(self, context):
+        layout = self.layout
+        layout.operator('octane.ms_library_browser', icon='ASSET_MANAGER')
+        layout.operator('octane.ms_library_index', icon='FILE_REFRESH')
+        layout.separator()
+        layout.operator('octane.ms_switch_lods', icon='MOD_DECIM')
+        layout.operator('octane.ms_disp_planner', icon='MOD_DISPLACE')
+        layout.separator()
+        layout.operator('octane.ms_livelink', icon='PLAY')
+        layout.operator('octane.ms_livelink_stop', icon='PAUSE')
+        layout.operator('octane.ms_livelink_restart', icon='FILE_REFRESH')
+        layout.operator('octane.ms_livelink_route', icon='FORWARD')
+        layout.operator('octane.ms_livelink_status', icon='INFO')
+        layout.operator('octane.ms_resume_imports', icon='RECOVER_LAST')
+        layout.operator('octane.ms_discard_imports', icon='TRASH')
+        layout.separator()
+        layout.operator('octane.ms_telemetry', icon='TIME')
+
 class OctaneInfoMenu(Menu):
     bl_label = 'Info'
     bl_idname = 'OCTANE_MT_info'
@@ -0,0 +1,82 @@
+# Megascans bulk import benchmark for the Octane Helper addon.
+#
+# Imports the same batch of small OBJ assets into scenes of growing size and
+# prints the time per asset, with and without bulk import. Run it with the
+# Octane edition of Blender and the addon installed:
+#
+#   blender -b --python tools/bench_bulk_import.py -- --scene-sizes 0 10000 100000 --assets 50
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import addon_utils
+import bpy
+
+def write_obj(path):
+    with open(path, 'w') as f:
+        f.write('v 0 0 0\nv 1 0 0\nv 1 1 0\nv 0 1 0\nf 1 2 3 4\n')
+
+def make_elements(folder, count):
+    elements = []
+    for i in range(count):
+        path = os.path.join(folder, 'asset_{}.obj'.format(i))
+        write_obj(path)
+        elements.append({
+            'name': 'Bench_{}'.format(i),
+            'id': 'bench{}'.format(i),
+            'type': '3d',
+            'path': folder,
+            'category': '3D',
+            'categories': ['3d'],
+            'tags': [],
+            'meshes': [{'path': path, 'format': 'obj'}],
+            'components': []
+        })
+    return elements
+
+def fill_scene(count):
+    bpy.data.batch_remove([obj for obj in bpy.data.objects])
+    mesh = bpy.data.meshes.new('Filler')
+    collection = bpy.context.scene.collection
+    for i in range(count):
+        collection.objects.link(bpy.data.objects.new('Filler', mesh))
+
+def run(elements, bulk):
+    from Octane_Helper.megascans import import_elements, prefetch_element
+    for element in elements:
+        prefetch_element(element)
+    start = time.perf_counter()
+    if(bulk):
+        import_elements(elements)
+    else:
+        for element in elements:
+            import_elements([element])
+    return (time.perf_counter() - start) / len(elements)
+
+def main():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description='Megascans bulk import benchmark')
+    parser.add_argument('--scene-sizes', type=int, nargs='+', default=[0, 10000, 100000])
+    parser.add_argument('--assets', type=int, default=50)
+    args = parser.parse_args(argv)
+
+    addon_utils.enable('Octane_Helper', default_set=True)
+    prefs = bpy.context.preferences.addons['Octane_Helper'].preferences
+    # Measure the object tracking, not the mesh cache
+    prefs.use_mesh_cache = False
+    bpy.context.scene.render.engine = 'octane'
+
+    with tempfile.TemporaryDirectory() as folder:
+        elements = make_elements(folder, args.assets)
+        print('{:>12} {:>18} {:>18}'.format('scene objs', 'per asset ms', 'bulk per asset ms'))
+        for size in args.scene_sizes:
+            fill_scene(size)
+            single = run([dict(element) for element in elements], False)
+            fill_scene(size)
+            bulk = run([dict(element) for element in elements], True)
+            print('{:>12} {:>18.2f} {:>18.2f}'.format(size, single * 1000, bulk * 1000))
+
+main()
@@ -0,0 +1,80 @@
+# Megascans material template benchmark for the Octane Helper addon.
+#
+# Builds the same Octane material for many assets, node by node and then by
+# copying the cached template, and prints the time per material. The images
+# are shared by all assets so only the node graph work is measured. Run it
+# with the Octane edition of Blender and the addon installed:
+#
+#   blender -b --python tools/bench_material_templates.py -- --materials 200
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import addon_utils
+import bpy
+
+maps = ['ao', 'albedo', 'roughness', 'displacement', 'normal']
+
+def write_images(folder):
+    paths = {}
+    for name in maps:
+        image = bpy.data.images.new('Bench_' + name, 16, 16)
+        image.filepath_raw = os.path.join(folder, name + '.png')
+        image.file_format = 'PNG'
+        image.save()
+        bpy.data.images.remove(image)
+        paths[name] = os.path.join(folder, name + '.png')
+    return paths
+
+def make_elements(paths, count, prefix):
+    return [{
+        'name': '{}_{}'.format(prefix, i),
+        'id': '{}{}'.format(prefix, i),
+        'type': 'surface',
+        'path': '',
+        'category': 'Ground',
+        'categories': ['surface'],
+        'tags': [],
+        'meshes': [],
+        'components': [{'type': name, 'path': paths[name], 'resolution': '2K'} for name in maps]
+    } for i in range(count)]
+
+def run(elements):
+    from Octane_Helper.megascans import import_material, prefetch_element
+    durations = []
+    for element in elements:
+        prefetch_element(element)
+        start = time.perf_counter()
+        import_material(element)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+def main():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description='Megascans material template benchmark')
+    parser.add_argument('--materials', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    addon_utils.enable('Octane_Helper', default_set=True)
+    prefs = bpy.context.preferences.addons['Octane_Helper'].preferences
+    prefs.use_texture_proxies = False
+    bpy.context.scene.render.engine = 'octane'
+
+    with tempfile.TemporaryDirectory() as folder:
+        paths = write_images(folder)
+        prefs.use_material_templates = False
+        built = run(make_elements(paths, args.materials, 'Built'))
+        prefs.use_material_templates = True
+        # The first material builds the template
+        copied = run(make_elements(paths, args.materials + 1, 'Copied'))[1:]
+
+    built_ms = sum(built) / len(built) * 1000
+    copied_ms = sum(copied) / len(copied) * 1000
+    print('{:>12} {:>16} {:>10}'.format('materials', 'ms per material', 'speedup'))
+    print('{:>12} {:>16.2f} {:>10}'.format('built', built_ms, ''))
+    print('{:>12} {:>16.2f} {:>9.1f}x'.format('template', copied_ms, built_ms / max(copied_ms, 1e-9)))
+
+main()
@@ -0,0 +1,111 @@
+# Fake Quixel Bridge load generator for the Octane Helper Megascans LiveLink.
+#
+# Sends Bridge-like JSON payloads of growing size from several concurrent
+# clients and reports throughput and memory per payload size. By default it
+# spins up the addon's LiveLink server in-process (no Blender needed), pass
+# --external to target a running Blender instead.
+#
+#   python tools/fake_bridge.py --sizes 1 4 16 64 --clients 4
+#   python tools/fake_bridge.py --external --port 28888 --sizes 8
+
+import argparse
+import importlib.util
+import json
+import os
+import socket
+import threading
+import time
+import tracemalloc
+
+threads_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'Octane_Helper', 'megascans', 'threads.py')
+
+def load_threads_module():
+    spec = importlib.util.spec_from_file_location('ms_threads', threads_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+asset_count = 10
+
+def make_payload(size_mb):
+    # Pad the tags so the payload reaches the requested size, like big batch exports do
+    padding = 'x' * max(0, int(size_mb * 1024 * 1024 / asset_count) - 512)
+    assets = [{
+        'name': 'Fake Asset {}'.format(i),
+        'id': 'fake{:04d}'.format(i),
+        'type': '3d',
+        'path': '',
+        'category': '3D',
+        'categories': ['3d'],
+        'tags': [padding],
+        'meshList': [],
+        'components': []
+    } for i in range(asset_count)]
+    return json.dumps(assets).encode()
+
+def send_payload(port, payload, chunk_size=64*1024):
+    with socket.create_connection(('localhost', port)) as s:
+        view = memoryview(payload)
+        for i in range(0, len(view), chunk_size):
+            s.sendall(view[i:i+chunk_size])
+
+def send_bye(port):
+    with socket.create_connection(('localhost', port)) as s:
+        s.sendall(b'Bye Megascans')
+
+def run_round(port, payload, clients, received=None, expected=0):
+    start = time.perf_counter()
+    workers = [threading.Thread(target=send_payload, args=(port, payload)) for i in range(clients)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    if received is not None:
+        # Wait until the server handed every asset to the importer
+        while len(received) < expected:
+            time.sleep(0.001)
+    return start, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake Quixel Bridge load generator')
+    parser.add_argument('--port', type=int, default=28890)
+    parser.add_argument('--buffer-size', type=int, default=4096*2)
+    parser.add_argument('--sizes', type=float, nargs='+', default=[1, 4, 16, 64], help='Payload sizes in MB')
+    parser.add_argument('--clients', type=int, default=4, help='Concurrent Bridge connections per round')
+    parser.add_argument('--external', action='store_true', help='Send to an already running LiveLink')
+    args = parser.parse_args()
+
+    received = None
+    if not args.external:
+        threads = load_threads_module()
+        received = []
+        # Only keep the arrival time, the assets themselves would skew the memory numbers
+        server = threads.ms_Init(lambda element: received.append(time.perf_counter()), args.port, args.buffer_size)
+        server.daemon = True
+        server.start()
+        time.sleep(0.2)
+        tracemalloc.start()
+
+    print('{:>10} {:>8} {:>12} {:>14} {:>10} {:>16}'.format('size MB', 'clients', 'MB/s', 'peak alloc MB', 'peak/size', 'first asset ms'))
+    for size_mb in args.sizes:
+        payload = make_payload(size_mb)
+        if received is not None:
+            received.clear()
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start, seconds = run_round(args.port, payload, args.clients, received, args.clients * asset_count)
+        throughput = len(payload) * args.clients / seconds / (1024 * 1024)
+        if received is not None:
+            # Payload bytes owned by the generator itself are part of the baseline
+            peak = (tracemalloc.get_traced_memory()[1] - base) / (1024 * 1024)
+            ratio = peak / (len(payload) * args.clients / (1024 * 1024))
+            first = (min(received) - start) * 1000
+            print('{:>10.1f} {:>8} {:>12.1f} {:>14.1f} {:>10.2f} {:>16.1f}'.format(size_mb, args.clients, throughput, peak, ratio, first))
+        else:
+            print('{:>10.1f} {:>8} {:>12.1f} {:>14} {:>10} {:>16}'.format(size_mb, args.clients, throughput, '-', '-', '-'))
+
+    if not args.external:
+        send_bye(args.port)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+# Record-and-replay benchmark for the Octane Helper Megascans LiveLink.
+#
+# 1. Record real Bridge exports by setting "Record Payloads" in the addon
+#    preferences, every payload lands there as payload_*.json.
+# 2. Turn them into a self-contained fixture, copying only the files they use:
+#      python tools/livelink_replay.py fixtures recorded/ fixture/
+# 3. Replay the fixture against a headless Blender with the addon installed:
+#      python tools/livelink_replay.py run fixture/ --blender /path/to/blender --rate 2 --concurrency 4 --repeat 5
+#
+# The run prints assets per minute, p50/p95 receive-to-imported latency and
+# the peak RSS of the Blender process.
+
+import argparse
+import glob
+import json
+import os
+import queue
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+tools_dir = os.path.dirname(os.path.realpath(__file__))
+fixture_root = '{FIXTURE}'
+
+def load_payloads(folder):
+    payloads = []
+    for path in sorted(glob.glob(os.path.join(folder, 'payload_*.json'))):
+        with open(path, 'rb') as f:
+            payloads.append(json.loads(f.read()))
+    return payloads
+
+def asset_files(asset):
+    for mesh in asset.get('meshList', []):
+        yield mesh
+    for component in asset.get('components', []):
+        yield component
+
+# Copy the meshes and textures referenced by the payloads, paths become relative to the fixture
+def make_fixtures(source, target):
+    os.makedirs(os.path.join(target, 'files'), exist_ok=True)
+    for index, payload in enumerate(load_payloads(source)):
+        for asset in payload:
+            for item in asset_files(asset):
+                path = item.get('path', '')
+                if(not os.path.isfile(path)):
+                    continue
+                name = '{}_{}'.format(asset.get('id', 'asset'), os.path.basename(path))
+                shutil.copyfile(path, os.path.join(target, 'files', name))
+                item['path'] = '/'.join([fixture_root, 'files', name])
+        with open(os.path.join(target, 'payload_{:04d}.json'.format(index)), 'w') as f:
+            json.dump(payload, f)
+    print('Wrote fixtures to', target)
+
+def resolve(payload, folder, run_id):
+    payload = json.loads(json.dumps(payload).replace(fixture_root, folder.replace('\\', '/')))
+    # Unique names tell the imported assets apart
+    for index, asset in enumerate(payload):
+        asset['name'] = '{}__r{}_{}'.format(asset['name'], run_id, index)
+    return payload
+
+# The name the importer reports, init_element replaces the spaces of Bridge names
+def asset_name(asset):
+    return asset['name'].replace(' ', '_')
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0
+
+def read_events(process, events):
+    for line in process.stdout:
+        if(line.startswith('MS_REPLAY ')):
+            events.put(json.loads(line[10:]))
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+def run(args):
+    payloads = load_payloads(args.fixture)
+    if(not payloads):
+        print('No payload_*.json in', args.fixture)
+        return 1
+    stop_file = os.path.join(tempfile.mkdtemp(), 'stop')
+    process = subprocess.Popen([args.blender, '-b', '--python', os.path.join(tools_dir, 'replay_blender.py'), '--', '--port', str(args.port), '--stop-file', stop_file],
+        stdout=subprocess.PIPE, universal_newlines=True)
+    events = queue.Queue()
+    threading.Thread(target=read_events, args=(process, events), daemon=True).start()
+    if(not events.get(timeout=args.timeout).get('ready')):
+        return 1
+
+    sent = {}
+    sends = [(run_id, payload) for run_id in range(args.repeat) for payload in payloads]
+    slots = threading.Semaphore(args.concurrency)
+
+    def send(run_id, payload):
+        with slots:
+            payload = resolve(payload, os.path.abspath(args.fixture), run_id)
+            start = time.time()
+            for asset in payload:
+                sent[asset_name(asset)] = start
+            with socket.create_connection(('localhost', args.port)) as s:
+                s.sendall(json.dumps(payload).encode())
+
+    start = time.time()
+    senders = []
+    for index, (run_id, payload) in enumerate(sends):
+        # Keep to the requested rate of payloads per second
+        delay = start + index / args.rate - time.time()
+        if(delay > 0):
+            time.sleep(delay)
+        sender = threading.Thread(target=send, args=(run_id, payload))
+        sender.start()
+        senders.append(sender)
+    for sender in senders:
+        sender.join()
+
+    total = sum([len(payload) for run_id, payload in sends])
+    latencies = []
+    last = start
+    while len(latencies) < total:
+        try:
+            event = events.get(timeout=args.timeout)
+        except queue.Empty:
+            print('Timed out with {} of {} assets imported'.format(len(latencies), total))
+            break
+        if(event.get('asset') in sent):
+            latencies.append(event['done'] - sent[event['asset']])
+            last = event['done']
+
+    open(stop_file, 'w').close()
+    process.wait()
+
+    minutes = max(last - start, 1e-6) / 60
+    rss = peak_rss_mb()
+    print('assets        {}'.format(len(latencies)))
+    print('assets/min    {:.1f}'.format(len(latencies) / minutes))
+    print('latency p50   {:.2f} s'.format(percentile(latencies, 0.5)))
+    print('latency p95   {:.2f} s'.format(percentile(latencies, 0.95)))
+    print('peak RSS      {}'.format('{:.0f} MB'.format(rss) if rss is not None else 'n/a'))
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description='Megascans LiveLink record-and-replay benchmark')
+    subparsers = parser.add_subparsers(dest='command')
+    fixtures = subparsers.add_parser('fixtures', help='Copy recorded payloads and the files they use into a fixture folder')
+    fixtures.add_argument('source')
+    fixtures.add_argument('target')
+    replay = subparsers.add_parser('run', help='Replay a fixture folder against blender -b')
+    replay.add_argument('fixture')
+    replay.add_argument('--blender', default='blender')
+    replay.add_argument('--port', type=int, default=28890)
+    replay.add_argument('--rate', type=float, default=1, help='Payloads sent per second')
+    replay.add_argument('--concurrency', type=int, default=1, help='Connections open at the same time')
+    replay.add_argument('--repeat', type=int, default=1, help='Times every payload is sent')
+    replay.add_argument('--timeout', type=float, default=600)
+    args = parser.parse_args()
+    if(args.command == 'fixtures'):
+        make_fixtures(args.source, args.target)
+        return 0
+    if(args.command == 'run'):
+        return run(args)
+    parser.print_help()
+    return 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,48 @@
+# Blender side of the Megascans LiveLink replay harness, started by livelink_replay.py.
+#
+# Starts the LiveLink inside `blender -b`, imports whatever arrives and prints
+# one "MS_REPLAY {...}" line per imported asset until the stop file appears.
+#
+#   blender -b --python tools/replay_blender.py -- --port 28890 --stop-file /tmp/stop
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import addon_utils
+import bpy
+
+def main():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description='Megascans LiveLink replay target')
+    parser.add_argument('--port', type=int, default=28890)
+    parser.add_argument('--stop-file', required=True)
+    args = parser.parse_args(argv)
+
+    addon_utils.enable('Octane_Helper', default_set=True)
+    prefs = bpy.context.preferences.addons['Octane_Helper'].preferences
+    prefs.livelink_port = args.port
+    prefs.telemetry_size = 1000000
+    bpy.context.scene.render.engine = 'octane'
+    bpy.ops.octane.ms_livelink()
+
+    from Octane_Helper.megascans import import_queued
+    import Octane_Helper.megascans.telemetry as ms_telemetry
+
+    print('MS_REPLAY ' + json.dumps({'ready': True}), flush=True)
+    # Timers do not run in background mode, drive the import loop here
+    # Sequence numbers, indexes shift once the deque is full
+    seen = -1
+    while not os.path.exists(args.stop_file):
+        import_queued()
+        for event in list(ms_telemetry.telemetry):
+            if(event['seq'] > seen and event['stage'] == 'asset'):
+                print('MS_REPLAY ' + json.dumps({'asset': event['asset'], 'done': time.time(), 'seconds': event['duration']}), flush=True)
+            seen = max(seen, event['seq'])
+        time.sleep(0.01)
+
+    bpy.ops.octane.ms_livelink_stop()
+
+main()